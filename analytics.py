@@ -0,0 +1,106 @@
+"""Sales reports from running totals kept alongside the order log.
+
+    python analytics.py --from 2024-01-01 --to 2024-02-01
+
+Totals are kept per calendar day: order count, revenue, revenue per hour
+of day, scoops per flavour and the container, payment and delivery mix. A
+report over any range of days just adds up those buckets, so it costs the
+same however many orders the days hold. The totals are checkpointed next
+to the log together with the number of orders they cover, so opening them
+only reads the orders placed since the last checkpoint.
+"""
+import argparse
+import json
+
+from checkpoint import CheckpointedIndex
+from order_store import OrderStore
+
+CHECKPOINT_VERSION = 1
+MIX_FIELDS = ("container", "payment", "delivery")
+
+
+def _new_day():
+    return {"orders": 0, "revenue": 0.0, "hours": [0.0] * 24, "scoops": {},
+            "container": {}, "payment": {}, "delivery": {}}
+
+
+def _count(counts, key, amount=1):
+    counts[key] = counts.get(key, 0) + amount
+
+
+class SalesAnalytics(CheckpointedIndex):
+    """Running per-day sales totals for an OrderStore."""
+
+    suffix = ".stats"
+    version = CHECKPOINT_VERSION
+
+    def __init__(self, store, checkpoint_file=None, checkpoint_every=500):
+        super().__init__(store, checkpoint_file, checkpoint_every)
+        self.days = {}
+
+    def reset(self):
+        self.days = {}
+
+    def restore(self, checkpoint):
+        self.days = checkpoint["days"]
+
+    def state(self):
+        return {"days": self.days}
+
+    def add(self, order):
+        timestamp = str(order.get("timestamp") or "")
+        day = self.days.get(timestamp[:10])
+        if day is None:
+            day = self.days[timestamp[:10]] = _new_day()
+        total = float(order.get("total") or 0)
+        day["orders"] += 1
+        day["revenue"] += total
+        try:
+            day["hours"][int(timestamp[11:13])] += total
+        except (ValueError, IndexError):
+            pass
+        # Keys are always strings so they survive the JSON checkpoint unchanged.
+        # A cart order counts the scoops and container of every item.
+        for item in order.get("items") or (order,):
+            _count(day["scoops"], str(item.get("flavor") or ""), int(item.get("scoops") or 0))
+            _count(day["container"], str(item.get("container") or ""))
+        for field in ("payment", "delivery"):
+            _count(day[field], str(order.get(field) or ""))
+
+    def report(self, start_day=None, end_day=None):
+        """Totals for the days in [start_day, end_day), given as "YYYY-MM-DD".
+
+        Either end may be None for an open range.
+        """
+        result = _new_day()
+        by_day = {}
+        for date, day in self.days.items():
+            if (start_day and date < start_day) or (end_day and date >= end_day):
+                continue
+            by_day[date] = day["revenue"]
+            result["orders"] += day["orders"]
+            result["revenue"] += day["revenue"]
+            for hour, revenue in enumerate(day["hours"]):
+                result["hours"][hour] += revenue
+            for field in ("scoops",) + MIX_FIELDS:
+                for key, amount in day[field].items():
+                    _count(result[field], key, amount)
+        result["revenue_by_day"] = dict(sorted(by_day.items()))
+        result["scoops"] = dict(sorted(result["scoops"].items(), key=lambda item: -item[1]))
+        return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders-file", default="all_orders.log")
+    parser.add_argument("--from", dest="start", help="first day to include, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="first day to leave out, YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    analytics = SalesAnalytics(OrderStore(args.orders_file)).load()
+    analytics.save()
+    print(json.dumps(analytics.report(args.start, args.end), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Sales report latency: full log scan vs. checkpointed running totals.
+
+Run from the repository root:
+
+    python -m benchmarks.analytics -n 200000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from analytics import SalesAnalytics
+from order_store import OrderStore, OrderWriter
+
+FLAVORS = ["Vanilla Bean", "Chocolate Fudge", "Strawberry Swirl", "Mint Chip", "Cookie Dough", "Mango"]
+
+
+def make_order(i, n):
+    # Spread the orders over roughly two years
+    moment = datetime.datetime(2023, 1, 1) + datetime.timedelta(minutes=i * 2 * 365 * 24 * 60 // n)
+    return {"order_id": 10000 + i, "customer_name": "Bench", "phone": "0300",
+            "flavor": FLAVORS[i % len(FLAVORS)], "scoops": i % 3 + 1,
+            "container": ("Cup", "Cone")[i % 2], "payment": ("Cash", "Card")[i % 5 == 0],
+            "delivery": ("Takeaway", "Delivery")[i % 7 == 0], "total": 150.0 * (i % 3 + 1),
+            "timestamp": moment.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def scan_report(store):
+    # What a report cost before: read every order and add it up
+    revenue = {}
+    for order in store.read(0):
+        day = order["timestamp"][:10]
+        revenue[day] = revenue.get(day, 0.0) + order["total"]
+    return revenue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=200_000, help="orders in the log")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OrderStore(os.path.join(tmp, "orders.log"))
+        writer = OrderWriter(store, mode="async")
+        for i in range(args.n):
+            writer.append(make_order(i, args.n))
+        writer.close()
+
+        scan, _ = timed(lambda: scan_report(store))
+        cold, analytics = timed(lambda: SalesAnalytics(store).load())
+        analytics.save()
+        warm, analytics = timed(lambda: SalesAnalytics(store).load())
+        report_all, _ = timed(lambda: analytics.report())
+        report_month, _ = timed(lambda: analytics.report("2024-06-01", "2024-07-01"))
+        writer = OrderWriter(store, mode="async")
+        writer.append(make_order(args.n, args.n))
+        writer.close()
+        incremental, _ = timed(analytics.catch_up)
+
+        print(f"{args.n:,} orders over {len(analytics.days)} days")
+        print(f"full log scan            {scan * 1e3:10.1f} ms")
+        print(f"build totals (no ckpt)   {cold * 1e3:10.1f} ms")
+        print(f"load from checkpoint     {warm * 1e3:10.1f} ms")
+        print(f"report, all time         {report_all * 1e3:10.2f} ms")
+        print(f"report, one month        {report_month * 1e3:10.2f} ms")
+        print(f"catch up one new order   {incremental * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Bulk pricing against the scalar price function.
+
+Run from the repository root:
+
+    python -m benchmarks.bulk_pricing -n 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bulk_pricing import encode, price_batch, price_codes
+from pricing import CONTAINER_PRICES, calculate_icecream_price
+
+
+def make_columns(n, menu, seed=1234):
+    rng = np.random.default_rng(seed)
+    # A few unknown flavours and out-of-range scoops so the 0.0 cases are covered
+    names = np.array(list(menu) + ["Unknown Flavour"])
+    flavors = names[rng.integers(0, len(names), n)]
+    scoops = rng.integers(0, 5, n)
+    containers = np.array(["Cup", "Cone"])[rng.integers(0, 2, n)]
+    return flavors, scoops, containers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=1_000_000, help="orders to price")
+    args = parser.parse_args()
+
+    menu = {f"Flavour {i}": 150.0 + i * 2.5 for i in range(40)}
+    container_prices = CONTAINER_PRICES
+    flavors, scoops, containers = make_columns(args.n, menu)
+
+    # The scalar path gets plain Python values, as the GUI would pass them
+    flavor_list, scoop_list, container_list = flavors.tolist(), scoops.tolist(), containers.tolist()
+    start = time.perf_counter()
+    expected = [calculate_icecream_price(f, s, menu, c, container_prices)
+                for f, s, c in zip(flavor_list, scoop_list, container_list)]
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals = price_batch(flavors, scoops, containers, menu, container_prices)
+    batch = time.perf_counter() - start
+
+    # Columns that are already dictionary-encoded skip the string matching
+    flavor_codes, flavor_vocab = encode(flavors, menu)
+    container_codes, container_vocab = encode(containers, container_prices)
+    flavor_prices = np.array([menu[f] for f in flavor_vocab.tolist()] + [np.nan])
+    container_table = np.array([container_prices[c] for c in container_vocab.tolist()] + [0.0])
+    start = time.perf_counter()
+    coded_totals = price_codes(flavor_codes, scoops, container_codes, flavor_prices, container_table)
+    coded = time.perf_counter() - start
+
+    expected = np.array(expected, dtype=np.float64)
+    if not (np.array_equal(totals, expected) and np.array_equal(coded_totals, expected)):
+        raise SystemExit("bulk totals differ from calculate_icecream_price")
+    print(f"{args.n} orders")
+    print(f"calculate_icecream_price  {scalar:8.3f} s  {args.n / scalar:>12,.0f} orders/s")
+    print(f"price_batch               {batch:8.3f} s  {args.n / batch:>12,.0f} orders/s")
+    print(f"price_codes (pre-encoded) {coded:8.3f} s  {args.n / coded:>12,.0f} orders/s")
+    print(f"speedup                   {scalar / batch:8.1f}x / {scalar / coded:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
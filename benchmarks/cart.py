@@ -0,0 +1,61 @@
+"""Per-item cost of a cart order against placing each item as its own order.
+
+Every order is validated, priced, committed with an fsync and gets a PDF
+receipt, as at the till. Run from the repository root:
+
+    python -m benchmarks.cart --sizes 1 6 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from order_service import OrderService
+from order_store import OrderStore, OrderWriter
+from pricing import CONTAINER_PRICES
+from receipts import ReceiptTemplate
+
+MENU = {"Vanilla Bean": 150.0, "Chocolate Fudge": 180.0, "Strawberry Swirl": 170.0, "Mango": 160.0}
+CUSTOMER = {"name": "Bench", "phone": "0300", "payment": "Cash", "delivery": "Takeaway"}
+
+
+def make_items(n):
+    flavors = list(MENU)
+    return [{"flavor": flavors[i % len(flavors)], "scoops": i % 3 + 1, "container": ("Cup", "Cone")[i % 2]}
+            for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 6, 20], help="items per cart")
+    parser.add_argument("--repeat", type=int, default=20, help="carts per size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OrderStore(os.path.join(tmp, "orders.log"))
+        writer = OrderWriter(store, mode="fsync")
+        template = ReceiptTemplate()
+        service = OrderService(MENU, CONTAINER_PRICES, writer,
+                               render_receipt=lambda order: template.render(
+                                   order, os.path.join(tmp, f"{order['order_id']}.pdf")))
+
+        service.place(dict(CUSTOMER, **make_items(1)[0]), receipt=True)  # warm up
+        print(f"{'items':>6} {'one by one':>14} {'as a cart':>14} {'speed-up':>9}")
+        for size in args.sizes:
+            items = make_items(size)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for item in items:
+                    service.place(dict(CUSTOMER, **item), receipt=True)
+            separate = (time.perf_counter() - start) / (args.repeat * size)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                service.place(dict(CUSTOMER, items=items), receipt=True)
+            cart = (time.perf_counter() - start) / (args.repeat * size)
+            print(f"{size:>6} {separate * 1e3:>10.3f} ms {cart * 1e3:>10.3f} ms {separate / cart:>8.1f}x")
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
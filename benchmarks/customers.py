@@ -0,0 +1,73 @@
+"""Customer autocomplete lookups over a large customer base.
+
+Run from the repository root:
+
+    python -m benchmarks.customers -n 150000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from customers import CustomerIndex
+from order_store import OrderStore, OrderWriter
+
+FLAVORS = ["Vanilla Bean", "Chocolate Fudge", "Strawberry Swirl", "Mint Chip", "Cookie Dough", "Mango"]
+NAMES = ["Ali", "Ayesha", "Bilal", "Fatima", "Hassan", "Zara", "Omar", "Sana", "Usman", "Hina"]
+
+
+def make_orders(customers, seed=1234):
+    rng = random.Random(seed)
+    for i in range(customers * 2):
+        c = rng.randrange(customers)
+        order = {"order_id": 10000 + i, "customer_name": f"{NAMES[c % len(NAMES)]} {c}",
+                 "phone": f"03{c * 7919 % 10**9:09d}", "flavor": rng.choice(FLAVORS),
+                 "scoops": 1, "timestamp": "2024-01-01 12:00:00"}
+        if c % 3 == 0:
+            order["address"] = f"House {c}, Street {c % 40}"
+        yield order
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=150_000, help="distinct customers (two orders each)")
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OrderStore(os.path.join(tmp, "orders.log"))
+        writer = OrderWriter(store, mode="async")
+        for order in make_orders(args.n):
+            writer.append(order)
+        writer.close()
+
+        start = time.perf_counter()
+        index = CustomerIndex(store).load()
+        build = time.perf_counter() - start
+        index.save()
+        start = time.perf_counter()
+        index = CustomerIndex(store).load()
+        warm = time.perf_counter() - start
+
+        rng = random.Random(42)
+        phones = [f"03{rng.randrange(10**4):04d}" for _ in range(args.lookups)]
+        names = [rng.choice(NAMES)[:rng.randint(1, 3)] for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for prefix in phones:
+            index.search_phone(prefix)
+        phone_time = (time.perf_counter() - start) / args.lookups
+        start = time.perf_counter()
+        for prefix in names:
+            index.search_name(prefix)
+        name_time = (time.perf_counter() - start) / args.lookups
+
+        print(f"{len(index):,} customers from {len(store):,} orders")
+        print(f"build from log           {build * 1e3:10.1f} ms")
+        print(f"load from checkpoint     {warm * 1e3:10.1f} ms")
+        print(f"phone prefix lookup      {phone_time * 1e6:10.1f} us")
+        print(f"name prefix lookup       {name_time * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Load generator for the local ordering API.
+
+By default it starts the API in-process on a free port with throwaway
+menu and order files, then drives it from keep-alive connections:
+
+    python -m benchmarks.load_api --connections 50 --requests 20000
+    python -m benchmarks.load_api --endpoint /orders
+    python -m benchmarks.load_api --target 127.0.0.1:8080
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from menu_store import write_snapshot
+from order_api import create_api
+
+ORDER = {"name": "Load Test", "phone": "0300 1234567", "flavor": "Vanilla Bean", "scoops": 2,
+         "container": "Cone", "payment": "Cash", "delivery": "Takeaway"}
+
+
+def build_request(endpoint, host):
+    if endpoint == "/menu":
+        return f"GET /menu HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1")
+    body = json.dumps(ORDER).encode("utf-8")
+    head = (f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def client(host, port, request, count, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+async def drive(args, host, port):
+    request = build_request(args.endpoint, host)
+    per_client = max(args.requests // args.connections, 1)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, request, per_client, latencies, failures)
+                           for _ in range(args.connections)))
+    return latencies, failures, time.perf_counter() - start
+
+
+async def run(args):
+    if args.target:
+        host, port = args.target.rsplit(":", 1)
+        latencies, failures, elapsed = await drive(args, host, int(port))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            menu_file = os.path.join(tmp, "menu.txt")
+            write_snapshot(menu_file, {"Vanilla Bean": 150.0, "Chocolate Fudge": 170.0})
+            api = create_api(menu_file, os.path.join(tmp, "all_orders.log"), receipts=False)
+            server = await api.start("127.0.0.1", 0)
+            try:
+                host, port = server.sockets[0].getsockname()[:2]
+                latencies, failures, elapsed = await drive(args, host, port)
+            finally:
+                # Closes the order log before the directory is removed
+                api.close()
+
+    total = len(latencies)
+    print(f"{args.endpoint}: {total} requests over {args.connections} connections in {elapsed:.2f}s")
+    print(f"throughput  {total / elapsed:,.0f} requests/s")
+    print(f"latency     p50 {percentile(latencies, 50) * 1e3:.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1e3:.2f} ms   max {max(latencies) * 1e3:.2f} ms")
+    if failures:
+        print(f"errors      {len(failures)} responses with status >= 400")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=["/menu", "/quote", "/orders"], default="/quote")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--target", help="host:port of an already running API")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
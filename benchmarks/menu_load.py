@@ -0,0 +1,50 @@
+"""Menu cold-start time: plain parse vs. the compiled cache.
+
+Run from the repository root:
+
+    python -m benchmarks.menu_load
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from menu_store import MenuStore, read_snapshot, write_snapshot
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'flavours':>10} {'parse':>10} {'cold':>10} {'cached':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            menu_file = os.path.join(tmp, f"menu_{size}.txt")
+            write_snapshot(menu_file, {f"Flavour {i}": 150.0 + i % 97 for i in range(size)})
+            cache_file = menu_file + ".cache"
+
+            def cold():
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+                MenuStore(menu_file).load()
+
+            parse = best_of(args.repeat, lambda: read_snapshot(menu_file))
+            cold_time = best_of(args.repeat, cold)
+            MenuStore(menu_file).load()
+            cached = best_of(args.repeat, lambda: MenuStore(menu_file).load())
+            print(f"{size:>10} {parse * 1e3:>8.2f}ms {cold_time * 1e3:>8.2f}ms {cached * 1e3:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Cost of timing a call with metrics on, and how close the percentiles are.
+
+With metrics off nothing is wrapped, so the "plain" column is also what a
+till started without --metrics pays. Run from the repository root:
+
+    python -m benchmarks.metrics -n 200000
+"""
+import argparse
+import random
+import time
+
+from metrics import Histogram, Metrics, QUANTILES
+
+
+def noop():
+    pass
+
+
+def per_call(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=200_000, help="calls to time")
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    timed = metrics.timed("noop", noop)
+    per_call(timed, 1000)  # warm up
+    plain = per_call(noop, args.n)
+    wrapped = per_call(timed, args.n)
+    print(f"plain call   {plain * 1e9:8.0f} ns")
+    print(f"timed call   {wrapped * 1e9:8.0f} ns  (+{(wrapped - plain) * 1e9:.0f} ns per call)")
+
+    # Latencies spread over four orders of magnitude, like a receipt queue
+    rng = random.Random(1)
+    samples = [rng.lognormvariate(-6, 1.5) for _ in range(args.n)]
+    histogram = Histogram()
+    for sample in samples:
+        histogram.record(sample)
+    samples.sort()
+    print(f"\n{'quantile':>8} {'exact':>12} {'histogram':>12} {'error':>7}")
+    for q in QUANTILES:
+        exact = samples[min(int(q * len(samples)), len(samples) - 1)]
+        estimate = histogram.quantile(q)
+        print(f"{q:>8} {exact * 1e3:>10.3f}ms {estimate * 1e3:>10.3f}ms {(estimate / exact - 1) * 100:>+6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
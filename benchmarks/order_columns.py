@@ -0,0 +1,105 @@
+"""Order history size and scan time: text file vs. order log vs. columns.
+
+Run from the repository root:
+
+    python -m benchmarks.order_columns -n 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from order_columns import OrderColumns, export_columns, read_log_orders, read_text_orders
+from order_store import OrderStore, OrderWriter
+from pricing import build_summary
+
+FLAVORS = ["Vanilla Bean", "Chocolate Fudge", "Strawberry Swirl", "Mint Chip", "Cookie Dough", "Mango"]
+
+
+def make_orders(n, seed=1234):
+    rng = random.Random(seed)
+    for i in range(n):
+        flavor, scoops = rng.choice(FLAVORS), rng.randint(1, 3)
+        container = rng.choice(["Cup", "Cone"])
+        payment, delivery = rng.choice(["Cash", "Card"]), rng.choice(["Takeaway", "Delivery"])
+        total = 150.0 * scoops + (10 if container == "Cone" else 0)
+        address = "House 12, Street 4" if delivery == "Delivery" else ""
+        card_number = "4111111111111111" if payment == "Card" else ""
+        order = {"order_id": 10000 + i, "customer_name": f"Customer {i % 5000}",
+                 "phone": f"0300{i % 5000:07d}", "flavor": flavor, "scoops": scoops,
+                 "container": container, "payment": payment, "delivery": delivery, "total": total,
+                 "timestamp": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} {i % 24:02d}:00:00",
+                 "summary": build_summary(f"Customer {i % 5000}", flavor, scoops, container, payment,
+                                          delivery, total, address, card_number)}
+        if address:
+            order["address"] = address
+        if card_number:
+            order["card_number"] = card_number
+        yield order
+
+
+def size_of(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def revenue_by_flavor(orders):
+    revenue = {}
+    for order in orders:
+        revenue[order["flavor"]] = revenue.get(order["flavor"], 0.0) + order["total"]
+    return revenue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=200_000, help="orders in the history")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_file = os.path.join(tmp, "all_orders.txt")
+        log_file = os.path.join(tmp, "all_orders.log")
+        columns_dir = os.path.join(tmp, "orders.columns")
+        with open(text_file, "w", encoding="utf-8") as f:
+            for order in make_orders(args.n):
+                f.write(str(order) + "\n")
+        writer = OrderWriter(OrderStore(log_file), mode="async")
+        for order in make_orders(args.n):
+            writer.append(order)
+        writer.close()
+
+        text_scan, expected = timed(lambda: revenue_by_flavor(read_text_orders(text_file)))
+        log_scan, _ = timed(lambda: revenue_by_flavor(read_log_orders(log_file)))
+        export, _ = timed(lambda: export_columns(read_log_orders(log_file), columns_dir))
+        open_time, columns = timed(lambda: OrderColumns(columns_dir))
+
+        def column_scan():
+            totals = np.bincount(columns["flavor"], weights=columns["total"])
+            return dict(zip(columns.categories["flavor"], totals.tolist()))
+
+        scan, revenue = timed(column_scan)
+        if revenue.keys() != expected.keys() or not np.allclose(
+                [revenue[f] for f in expected], list(expected.values())):
+            raise SystemExit("column scan disagrees with the text scan")
+        rebuild, _ = timed(lambda: sum(1 for _ in columns.iter_orders()))
+
+        print(f"{args.n:,} orders")
+        print(f"{'format':<22} {'size':>10} {'revenue by flavour':>20}")
+        print(f"{'text (str(dict))':<22} {size_of(text_file) / 1e6:>8.1f}MB {text_scan * 1e3:>18.1f}ms")
+        print(f"{'order log':<22} {size_of(log_file) / 1e6:>8.1f}MB {log_scan * 1e3:>18.1f}ms")
+        print(f"{'columns':<22} {size_of(columns_dir) / 1e6:>8.1f}MB {scan * 1e3:>18.1f}ms")
+        print(f"export from log {export * 1e3:.1f}ms, open {open_time * 1e3:.2f}ms, "
+              f"rebuild every order dict {rebuild * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Order log write throughput and commit latency per durability mode.
+
+Run from the repository root:
+
+    python -m benchmarks.order_writer -n 5000 --threads 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from order_store import DURABILITY_MODES, OrderStore, OrderWriter
+
+
+def make_order(i):
+    return {"order_id": 10000 + i, "customer_name": "Bench", "phone": "0300", "flavor": "Vanilla Bean",
+            "scoops": 2, "container": "Cone", "payment": "Cash", "delivery": "Takeaway",
+            "total": 310.0, "timestamp": "2024-01-01 12:00:00",
+            "summary": "Order Summary for Bench:\n\n- 2 scoop(s) of Vanilla Bean in a Cone\n"}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def run(append, n, threads):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(start):
+        local = []
+        for i in range(start, n, threads):
+            t = time.perf_counter()
+            append(make_order(i))
+            local.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(name, n, elapsed, latencies, extra=""):
+    print(f"{name:<24} {n / elapsed:>10,.0f} orders/s   "
+          f"p50 {percentile(latencies, 50) * 1e3:7.3f} ms   "
+          f"p99 {percentile(latencies, 99) * 1e3:7.3f} ms{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=5000, help="orders per mode")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent appenders")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OrderStore(os.path.join(tmp, "baseline.log"))
+        elapsed, latencies = run(store.append, args.n, args.threads)
+        report("open/append/close", args.n, elapsed, latencies, "   (no fsync)")
+
+        for mode in DURABILITY_MODES:
+            store = OrderStore(os.path.join(tmp, f"{mode}.log"))
+            writer = OrderWriter(store, mode=mode)
+            elapsed, latencies = run(writer.append, args.n, args.threads)
+            start = time.perf_counter()
+            writer.flush()
+            elapsed += time.perf_counter() - start
+            writer.close()
+            if len(store) != args.n:
+                raise SystemExit(f"{mode}: expected {args.n} orders, found {len(store)}")
+            report(mode, args.n, elapsed, latencies, f"   {writer.commits} commits")
+
+
+if __name__ == "__main__":
+    main()
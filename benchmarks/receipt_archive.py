@@ -0,0 +1,74 @@
+"""Receipt storage: one PDF file per order vs. the compressed archive.
+
+Run from the repository root:
+
+    python -m benchmarks.receipt_archive -n 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from receipt_archive import ReceiptArchive
+from receipts import ReceiptTemplate
+from benchmarks.receipts import make_orders
+
+
+def disk_usage(directory):
+    names = os.listdir(directory)
+    return len(names), sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20_000, help="receipts to store")
+    parser.add_argument("--lookups", type=int, default=2000, help="random receipts to fetch back")
+    args = parser.parse_args()
+
+    orders = make_orders(args.n)
+    wanted = random.Random(1).sample(orders, min(args.lookups, args.n))
+    with tempfile.TemporaryDirectory() as tmp:
+        files_dir = os.path.join(tmp, "files")
+        os.makedirs(files_dir)
+        template = ReceiptTemplate()
+
+        def write_files():
+            for order in orders:
+                template.render(order, os.path.join(files_dir, f"{order['order_id']}_receipt.pdf"))
+
+        def read_files():
+            for order in wanted:
+                with open(os.path.join(files_dir, f"{order['order_id']}_receipt.pdf"), "rb") as f:
+                    f.read()
+
+        archive = ReceiptArchive(os.path.join(tmp, "receipts"))
+
+        def write_archive():
+            for order in orders:
+                archive.add(order)
+
+        def read_archive():
+            for order in wanted:
+                archive.read(order["order_id"])
+
+        results = [("one file per order", timed(write_files), timed(read_files), *disk_usage(files_dir)),
+                   ("archive", timed(write_archive), timed(read_archive), *disk_usage(archive.directory))]
+        reopen = timed(lambda: len(ReceiptArchive(archive.directory)))
+
+        print(f"{args.n:,} receipts, {len(wanted):,} random fetches")
+        print(f"{'storage':<20} {'write/receipt':>14} {'fetch':>10} {'files':>7} {'size':>10}")
+        for name, write, read, files, size in results:
+            print(f"{name:<20} {write / args.n * 1e3:>11.3f}ms {read / len(wanted) * 1e6:>8.1f}us "
+                  f"{files:>7} {size / 1e6:>8.2f}MB")
+        print(f"opening the archive index: {reopen * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
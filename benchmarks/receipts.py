@@ -0,0 +1,84 @@
+"""Receipt rendering throughput.
+
+Run from the repository root:
+
+    python -m benchmarks.receipts -n 500
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from receipts import ReceiptTemplate, generate_pdf_receipt
+
+FLAVORS = ["Vanilla Bean", "Chocolate Fudge", "Mango Sorbet", "Pistachio Delight"]
+
+
+def make_orders(n):
+    orders = []
+    for i in range(n):
+        flavor = FLAVORS[i % len(FLAVORS)]
+        scoops = i % 3 + 1
+        total = 150.0 * scoops
+        summary = (f"Order Summary for Customer {i}:\n\n"
+                   f"- {scoops} scoop(s) of {flavor} in a Cup\n"
+                   f"- Payment: Cash\n"
+                   f"- Delivery: Takeaway\n"
+                   f"- Total: Rs.{total:.2f}\n")
+        orders.append({"order_id": 100000 + i, "customer_name": f"Customer {i}",
+                       "timestamp": "2024-01-01 12:00:00", "summary": summary, "total": total})
+    return orders
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def report(name, n, elapsed, latencies=None):
+    line = f"{name:<22} {n / elapsed:>9.1f} receipts/s"
+    if latencies:
+        line += (f"   p50 {percentile(latencies, 50) * 1e3:.3f} ms"
+                 f"   p95 {percentile(latencies, 95) * 1e3:.3f} ms"
+                 f"   p99 {percentile(latencies, 99) * 1e3:.3f} ms"
+                 f"   mean {statistics.mean(latencies) * 1e3:.3f} ms")
+    print(line)
+
+
+def time_each(render, orders):
+    latencies = []
+    start = time.perf_counter()
+    for order in orders:
+        t = time.perf_counter()
+        render(order)
+        latencies.append(time.perf_counter() - t)
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=500, help="receipts per run")
+    args = parser.parse_args()
+
+    orders = make_orders(args.n)
+    template = ReceiptTemplate()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            elapsed, latencies = time_each(generate_pdf_receipt, orders)
+            report("generate_pdf_receipt", args.n, elapsed, latencies)
+
+            elapsed, latencies = time_each(template.render, orders)
+            report("template, one file", args.n, elapsed, latencies)
+
+            start = time.perf_counter()
+            template.render_batch(orders, "batch.pdf")
+            report("template, batch PDF", args.n, time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
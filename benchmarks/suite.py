@@ -0,0 +1,301 @@
+"""Benchmark suite for the ordering hot paths, with baseline comparison.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --save-baseline        # record a baseline
+    python -m benchmarks.suite                        # compare against it
+    python -m benchmarks.suite --quick -k menu        # small sizes, menu cases only
+
+All data is generated from fixed seeds, so two runs measure the same work.
+Results go to a JSON file (--output). With a baseline present, every case
+is compared against it on its best run, which is far steadier than the
+mean on a busy machine, and any case more than --threshold slower is
+reported as a regression; --strict makes that a non-zero exit. The Tk
+cases use a withdrawn root and are skipped when there is no display.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from menu_store import MenuStore
+from order_history import OrderHistory
+from order_store import INDEX_ENTRY, RECORD_HEADER, OrderStore, OrderWriter, encode_order, timestamp_to_epoch
+from pricing import CONTAINER_PRICES, build_summary, calculate_icecream_price
+from receipts import ReceiptTemplate, generate_pdf_receipt
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def make_menu(size, seed=1):
+    rng = random.Random(seed)
+    return {f"Flavour {i:06d}": float(rng.randrange(100, 400)) for i in range(size)}
+
+
+def make_order(rng, i, menu_names):
+    flavor = rng.choice(menu_names)
+    scoops = rng.randint(1, 3)
+    container = rng.choice(["Cup", "Cone"])
+    total = 150.0 * scoops + CONTAINER_PRICES[container]
+    timestamp = (datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=i * 37)).strftime("%Y-%m-%d %H:%M:%S")
+    return {"order_id": 10000 + i, "customer_name": f"Customer {i % 997}", "phone": f"0300{i % 997:07d}",
+            "flavor": flavor, "scoops": scoops, "container": container, "payment": "Cash",
+            "delivery": "Takeaway", "total": total, "timestamp": timestamp,
+            "summary": build_summary(f"Customer {i % 997}", flavor, scoops, container, "Cash",
+                                     "Takeaway", total)}
+
+
+def write_order_log(log_file, n, seed=2):
+    """Write n orders straight into the log and index format, without fsyncs."""
+    rng = random.Random(seed)
+    names = list(make_menu(20))
+    offset = 0
+    with open(log_file, "wb") as log, open(os.path.splitext(log_file)[0] + ".idx", "wb") as index:
+        for i in range(n):
+            order = make_order(rng, i, names)
+            record = encode_order(order)
+            log.write(record)
+            index.write(INDEX_ENTRY.pack(order["order_id"], timestamp_to_epoch(order["timestamp"]),
+                                         offset, len(record) - RECORD_HEADER.size))
+            offset += len(record)
+
+
+def timed_calls(fn, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn, repeat=5, min_time=0.05):
+    """Return per-call seconds for each of ``repeat`` runs.
+
+    Like timeit's autorange, each run makes enough calls to last at least
+    ``min_time``, so fast cases are not lost in timer noise; calibrating
+    also warms up caches before the first measured run.
+    """
+    number = 1
+    while True:
+        if timed_calls(fn, number) >= min_time:
+            break
+        number *= 10 if number < 1000 else 2
+    return [timed_calls(fn, number) / number for _ in range(repeat)]
+
+
+class Suite:
+    def __init__(self, workdir, quick=False, repeat=5, pattern=None):
+        self.workdir = workdir
+        self.quick = quick
+        self.repeat = repeat
+        self.pattern = pattern
+        self.results = {}
+
+    def wanted(self, name):
+        return self.pattern is None or self.pattern in name
+
+    def record(self, name, samples, **info):
+        self.results[name] = dict(info, min=min(samples), median=statistics.median(samples),
+                                  runs=len(samples))
+        print(f"{name:<36} {min(samples) * 1e3:>12.4f} ms", flush=True)
+
+    def skip(self, name, reason):
+        self.results[name] = {"skipped": reason}
+        print(f"{name:<36} {'skipped':>12}  ({reason})", flush=True)
+
+    def menu_cases(self):
+        for size in (100, 10_000) if self.quick else (100, 10_000, 100_000):
+            menu_file = os.path.join(self.workdir, f"menu_{size}.txt")
+            menu = make_menu(size)
+            MenuStore(menu_file).replace(menu)
+            # An edit at the till is a journal append, plus a compaction
+            # into a new snapshot every compact_after edits; measure()
+            # makes enough calls per run to include its share of those
+            name = f"menu_edit/{size}/reprice"
+            if self.wanted(name):
+                store = MenuStore(menu_file)
+                store.load()
+                flavor = next(iter(menu))
+                prices = iter(range(10**9))
+                self.record(name, measure(lambda: store.reprice(flavor, 100.0 + next(prices) % 300),
+                                          repeat=self.repeat))
+            name = f"menu_edit/{size}/add"
+            if self.wanted(name):
+                store = MenuStore(menu_file)
+                store.load()
+                added = iter(range(10**9))
+                self.record(name, measure(lambda: store.add(f"New flavour {next(added)}", 150.0),
+                                          repeat=self.repeat))
+            # Put the plain snapshot back for the load cases
+            MenuStore(menu_file).replace(menu)
+            cache_file = menu_file + ".cache"
+
+            def cold_load():
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+                MenuStore(menu_file).load()
+
+            name = f"load_menu_from_file/{size}/cold"
+            if self.wanted(name):
+                self.record(name, measure(cold_load, repeat=self.repeat))
+            name = f"load_menu_from_file/{size}/cached"
+            if self.wanted(name):
+                MenuStore(menu_file).load()
+                self.record(name, measure(lambda: MenuStore(menu_file).load(), repeat=self.repeat))
+
+    def order_cases(self):
+        for size in (10_000,) if self.quick else (10_000, 100_000, 1_000_000):
+            name = f"load_all_orders/{size}"
+            if not self.wanted(name):
+                continue
+            log_file = os.path.join(self.workdir, f"orders_{size}.log")
+            write_order_log(log_file, size)
+            # What the app does at startup: open (and check) the log, then
+            # read the recent window into the history
+            self.record(name, measure(lambda: OrderHistory(OrderStore(log_file)), repeat=self.repeat),
+                        orders=size)
+
+        name = "save_order_to_file"
+        if self.wanted(name):
+            store = OrderStore(os.path.join(self.workdir, "save.log"))
+            writer = OrderWriter(store, mode="group")
+            rng = random.Random(3)
+            names = list(make_menu(20))
+            order = make_order(rng, 0, names)
+            self.record(name, measure(lambda: writer.append(order), repeat=self.repeat))
+            writer.close()
+
+        name = "calculate_icecream_price"
+        if self.wanted(name):
+            menu = make_menu(20)
+            flavor = next(iter(menu))
+            self.record(name, measure(lambda: calculate_icecream_price(flavor, 2, menu, "Cone", CONTAINER_PRICES),
+                                      repeat=self.repeat))
+
+    def receipt_cases(self):
+        rng = random.Random(4)
+        order = make_order(rng, 0, list(make_menu(20)))
+        name = "generate_pdf_receipt"
+        if self.wanted(name):
+            # generate_pdf_receipt writes into the working directory
+            cwd = os.getcwd()
+            os.chdir(self.workdir)
+            try:
+                self.record(name, measure(lambda: generate_pdf_receipt(order), repeat=self.repeat))
+            finally:
+                os.chdir(cwd)
+        name = "receipt_template_render"
+        if self.wanted(name):
+            template = ReceiptTemplate()
+            filename = os.path.join(self.workdir, "template_receipt.pdf")
+            self.record(name, measure(lambda: template.render(order, filename), repeat=self.repeat))
+
+    def tk_cases(self):
+        sizes = (100, 10_000) if self.quick else (100, 10_000, 100_000)
+        names = [f"create_menu_canvas/{size}" for size in sizes]
+        if not any(self.wanted(name) for name in names):
+            return
+        try:
+            import tkinter as tk
+            from menu_view import MenuListView
+
+            root = tk.Tk()
+        except Exception as e:
+            for name in names:
+                if self.wanted(name):
+                    self.skip(name, f"no display: {e}")
+            return
+        root.withdraw()
+        try:
+            for size, name in zip(sizes, names):
+                if not self.wanted(name):
+                    continue
+                menu = make_menu(size)
+                frame = tk.Frame(root, width=400, height=600)
+                frame.pack()
+                views = []
+
+                def create():
+                    # Replace the previous view, as create_menu_canvas does
+                    if views:
+                        views.pop().destroy()
+                    views.append(MenuListView(frame, menu))
+                    root.update_idletasks()
+
+                self.record(name, measure(create, repeat=self.repeat))
+                frame.destroy()
+        finally:
+            root.destroy()
+
+    def run(self):
+        self.menu_cases()
+        self.order_cases()
+        self.receipt_cases()
+        self.tk_cases()
+        return self.results
+
+
+def compare(results, baseline, threshold):
+    """Print each case against the baseline; returns the regressed case names."""
+    regressions = []
+    print(f"\n{'case':<36} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if "min" not in result or not before or "min" not in before:
+            continue
+        ratio = result["min"] / before["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<36} {before['min'] * 1e3:>10.4f}ms {result['min'] * 1e3:>10.4f}ms "
+              f"{(ratio - 1) * 100:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best one is compared")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown that counts as a regression (default 0.25 = 25%%)")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 on any regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = Suite(tmp, quick=args.quick, repeat=args.repeat, pattern=args.pattern).run()
+
+    report = {"python": sys.version.split()[0], "platform": platform.platform(),
+              "date": datetime.datetime.now().isoformat(timespec="seconds"), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    except (OSError, ValueError, KeyError):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        if args.strict:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
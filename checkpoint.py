@@ -0,0 +1,103 @@
+"""Indexes built from the order log and checkpointed next to it.
+
+The sales totals and the customer index both fold every order into some
+in-memory state. Rather than read the whole log on every start, that state
+is saved as JSON together with the number of orders it covers, and opening
+it only reads the orders placed after the checkpoint.
+"""
+import json
+import os
+
+
+class CheckpointedIndex:
+    """Base for state folded from an OrderStore and saved to a checkpoint.
+
+    Subclasses set ``suffix`` (the checkpoint's extension next to the log)
+    and ``version``, and implement reset(), restore(checkpoint), state()
+    and add(order). Call catch_up() to fold in orders appended since the
+    last call, from this till or any other sharing the store.
+
+    Only load() and save() write the checkpoint. The till calls catch_up()
+    on the Tk thread after every order, so it never does; the till saves
+    on close, and one that crashed just reads a few more orders on its
+    next start.
+    """
+
+    suffix = None
+    version = 1
+
+    def __init__(self, store, checkpoint_file=None, checkpoint_every=500):
+        self.store = store
+        self.checkpoint_file = checkpoint_file or os.path.splitext(store.log_file)[0] + self.suffix
+        self.checkpoint_every = checkpoint_every
+        self.position = 0
+        self._unsaved = 0
+
+    def reset(self):
+        raise NotImplementedError
+
+    def restore(self, checkpoint):
+        raise NotImplementedError
+
+    def state(self):
+        """The checkpointed fields, as a dict of JSON-serialisable values."""
+        raise NotImplementedError
+
+    def add(self, order):
+        raise NotImplementedError
+
+    def load(self):
+        """Restore the last checkpoint and read any orders placed after it.
+
+        If that meant reading at least ``checkpoint_every`` orders, a new
+        checkpoint is saved so the next start does not read them again.
+        """
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            checkpoint = None
+        if (checkpoint and checkpoint.get("version") == self.version
+                and checkpoint["position"] <= len(self.store)):
+            self.position = checkpoint["position"]
+            self.restore(checkpoint)
+        else:
+            # Missing, stale or from a different log: rebuild from scratch
+            self.position = 0
+            self.reset()
+        self.catch_up()
+        if self._unsaved >= self.checkpoint_every:
+            self.save()
+        return self
+
+    def catch_up(self, chunk=4096):
+        """Add orders appended since the last call; returns how many."""
+        start = self.position
+        count = len(self.store)
+        self._start_catch_up(count - start)
+        while self.position < count:
+            stop = min(self.position + chunk, count)
+            for order in self.store.read(self.position, stop):
+                self.add(order)
+            self.position = stop
+        self._finish_catch_up(count - start)
+        self._unsaved += count - start
+        return count - start
+
+    def _start_catch_up(self, new):
+        """Called before ``new`` orders are added by catch_up()."""
+
+    def _finish_catch_up(self, new):
+        """Called once catch_up() has added ``new`` orders."""
+
+    def save(self):
+        """Write the state and the number of orders it covers, atomically."""
+        # Per-process temp name so tills saving at the same time don't
+        # collide; json.dumps uses the C encoder, json.dump to a file does not
+        data = json.dumps(dict(self.state(), version=self.version, position=self.position),
+                          separators=(",", ":"))
+        tmp = f"{self.checkpoint_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.checkpoint_file)
+        self._unsaved = 0
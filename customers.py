@@ -0,0 +1,114 @@
+"""Repeat-customer lookup by phone or name prefix.
+
+Customers are keyed on phone number and remember the name and delivery
+address from their latest order plus how often they picked each flavour.
+Two sorted lists, one of phone numbers and one of (lowercased name, phone)
+pairs, answer a prefix query with a bisect and a short walk, so lookups
+stay well under a millisecond however many customers there are.
+
+Like the sales totals, the index is checkpointed next to the order log with
+the number of orders it covers and only reads newer orders when opened.
+"""
+import bisect
+
+from checkpoint import CheckpointedIndex
+
+CHECKPOINT_VERSION = 1
+
+
+class CustomerIndex(CheckpointedIndex):
+    suffix = ".customers"
+    version = CHECKPOINT_VERSION
+
+    def __init__(self, store, checkpoint_file=None, checkpoint_every=500):
+        super().__init__(store, checkpoint_file, checkpoint_every)
+        self.customers = {}
+        self._phones = []
+        self._names = []
+        self._bulk = False
+
+    def __len__(self):
+        return len(self.customers)
+
+    def reset(self):
+        self.customers = {}
+        self._sort()
+
+    def restore(self, checkpoint):
+        self.customers = checkpoint["customers"]
+        self._sort()
+
+    def state(self):
+        return {"customers": self.customers}
+
+    def _sort(self):
+        self._phones = sorted(self.customers)
+        self._names = sorted((customer["name"].casefold(), phone)
+                             for phone, customer in self.customers.items())
+
+    def _start_catch_up(self, new):
+        # Each insort shifts the whole list, so for a big backlog it is much
+        # cheaper to add everything unsorted and sort once at the end
+        self._bulk = new > 1000
+
+    def _finish_catch_up(self, new):
+        if self._bulk:
+            self._bulk = False
+            self._sort()
+
+    def add(self, order):
+        phone = str(order.get("phone") or "").strip()
+        if not phone:
+            return
+        name = str(order.get("customer_name") or "").strip()
+        customer = self.customers.get(phone)
+        if customer is None:
+            customer = self.customers[phone] = {"name": name, "address": "", "flavors": {}, "orders": 0}
+            if not self._bulk:
+                bisect.insort(self._phones, phone)
+                bisect.insort(self._names, (name.casefold(), phone))
+        elif customer["name"] != name:
+            if not self._bulk:
+                old = (customer["name"].casefold(), phone)
+                i = bisect.bisect_left(self._names, old)
+                if i < len(self._names) and self._names[i] == old:
+                    del self._names[i]
+                bisect.insort(self._names, (name.casefold(), phone))
+            customer["name"] = name
+        if order.get("address"):
+            customer["address"] = order["address"]
+        for item in order.get("items") or (order,):
+            flavor = item.get("flavor")
+            if flavor:
+                customer["flavors"][flavor] = customer["flavors"].get(flavor, 0) + 1
+        customer["orders"] += 1
+
+    def get(self, phone):
+        """Return the customer with this phone number, or None."""
+        customer = self.customers.get(phone)
+        return None if customer is None else self._describe(phone, customer)
+
+    def _describe(self, phone, customer):
+        flavors = customer["flavors"]
+        return {"name": customer["name"], "phone": phone, "address": customer["address"],
+                "favorite_flavor": max(flavors, key=flavors.get) if flavors else None,
+                "orders": customer["orders"]}
+
+    def search_phone(self, prefix, limit=8):
+        """Customers whose phone number starts with prefix, in phone order."""
+        matches = []
+        i = bisect.bisect_left(self._phones, prefix)
+        while i < len(self._phones) and len(matches) < limit and self._phones[i].startswith(prefix):
+            matches.append(self.get(self._phones[i]))
+            i += 1
+        return matches
+
+    def search_name(self, prefix, limit=8):
+        """Customers whose name starts with prefix (any case), in name order."""
+        prefix = prefix.casefold()
+        matches = []
+        i = bisect.bisect_left(self._names, (prefix,))
+        while i < len(self._names) and len(matches) < limit and self._names[i][0].startswith(prefix):
+            matches.append(self.get(self._names[i][1]))
+            i += 1
+        return matches
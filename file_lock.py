@@ -0,0 +1,39 @@
+"""Exclusive whole-file locks shared between processes (POSIX and Windows)."""
+import contextlib
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def locked(f):
+    """Hold an exclusive lock on the open binary file f for the with block."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+    # msvcrt locks a byte range from the current position; lock the first byte
+    position = f.tell()
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    f.seek(position)
+    try:
+        yield f
+    finally:
+        position = f.tell()
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.seek(position)
+
+
+def open_lock_file(path):
+    """Open (creating if needed) a file to use with locked()."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    return os.fdopen(fd, "r+b", buffering=0)
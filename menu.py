@@ -1,4 +1,9 @@
-flavors = {
+import os
+
+from menu_store import MenuStore, load_menu
+
+# Starting menu written by running this script; the live menu is menu.txt
+default_flavors = {
     "Vanilla Bean": 150,
     "Chocolate Fudge": 170,
     "Strawberry Swirl": 160,
@@ -21,10 +26,9 @@ flavors = {
     "Birthday Cake": 190
 }
 
-with open("menu.txt", "w") as file:
-    for flavor, price in flavors.items():
-        file.write(f"{flavor} - {price}\n")
-
-print("menu.txt created!")
-
+# Same data the GUI sees, read through the shared menu loader
+flavors = load_menu("menu.txt") if os.path.exists("menu.txt") else dict(default_flavors)
 
+if __name__ == "__main__":
+    MenuStore("menu.txt").replace(default_flavors)
+    print("menu.txt created!")
@@ -0,0 +1,320 @@
+import contextlib
+import json
+import marshal
+import os
+
+from file_lock import locked, open_lock_file
+
+CACHE_VERSION = 3
+# First line of a compacted menu.txt; parse_menu_line skips it
+GENERATION_LINE = "# generation "
+
+
+def parse_menu_line(line):
+    """Parse one "Flavor - price" line; returns (flavor, price) or None."""
+    if '-' not in line:
+        return None
+    parts = line.strip().split('-', 1)
+    if len(parts) != 2:
+        return None
+    try:
+        return parts[0].strip(), float(parts[1].strip())
+    except ValueError:
+        return None
+
+
+def write_snapshot(filename, menu, generation=0):
+    """Write the whole menu to filename without ever leaving it half-written."""
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        if generation:
+            f.write(f"{GENERATION_LINE}{generation}\n")
+        for flavor, price in menu.items():
+            f.write(f"{flavor} - {price}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def file_signature(filename):
+    st = os.stat(filename)
+    return st.st_mtime_ns, st.st_size
+
+
+def _parse_generation(line):
+    if not line.startswith(GENERATION_LINE):
+        return 0
+    try:
+        return int(line[len(GENERATION_LINE):])
+    except ValueError:
+        return 0
+
+
+def read_snapshot_generation(filename):
+    """Return (menu, generation) from a snapshot file; generation 0 if it has none."""
+    menu = {}
+    generation = 0
+    with open(filename, "r") as f:
+        first = f.readline()
+        if first.startswith(GENERATION_LINE):
+            generation = _parse_generation(first)
+        else:
+            f.seek(0)
+        for line in f:
+            item = parse_menu_line(line)
+            if item:
+                menu[item[0]] = item[1]
+    return menu, generation
+
+
+def read_snapshot(filename):
+    return read_snapshot_generation(filename)[0]
+
+
+def snapshot_generation(filename):
+    """The generation of a snapshot file, read from its first line only."""
+    try:
+        with open(filename, "r") as f:
+            return _parse_generation(f.readline())
+    except FileNotFoundError:
+        return 0
+
+
+def read_cache(cache_file, signature):
+    """Return (generation, (flavor, price) pairs) if built from this exact file version."""
+    try:
+        with open(cache_file, "rb") as f:
+            # marshal.loads on the whole buffer is far faster than marshal.load(f)
+            version, cached_signature, generation, flavors, prices = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION or tuple(cached_signature) != signature:
+        return None
+    return generation, zip(flavors, prices)
+
+
+def write_cache(cache_file, signature, menu, generation=0):
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        # Prices are stored as floats, exactly as parsing menu.txt would give them
+        prices = tuple(float(price) for price in menu.values())
+        f.write(marshal.dumps((CACHE_VERSION, signature, generation, tuple(menu), prices)))
+    os.replace(tmp, cache_file)
+
+
+def _fsync_directory(filename):
+    # Makes a rename in that directory durable; Windows can't open a directory
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def apply_change(menu, change):
+    op = change["op"]
+    if op == "add" or op == "reprice":
+        menu[change["flavor"]] = change["price"]
+    elif op == "rename":
+        # Same as the GUI: a renamed flavor moves to the end of the menu
+        menu[change["new"]] = menu.pop(change["old"])
+    # A "generation" record only heads the journal; see MenuStore
+
+
+class MenuStore:
+    """menu.txt snapshot plus an append-only journal of edits.
+
+    Each add, rename or reprice is one small journal append, so an edit costs
+    the same however large the menu is. Once the journal holds more than
+    ``compact_after`` records it is folded into a fresh snapshot, written to
+    a temp file and renamed over menu.txt.
+
+    Each compaction bumps a generation number kept on menu.txt's first line,
+    and the journal starts with a record naming the generation it was begun
+    on. Replaying a journal over a snapshot it was already folded into is
+    not safe (add X, rename X to Y, add X fails the second time round), so a
+    journal from another generation is skipped: that is what a crash
+    between writing menu.txt and replacing the journal leaves behind.
+
+    The parsed snapshot is also kept in a marshal cache next to menu.txt,
+    tagged with the file's mtime and size, so it is only re-parsed after it
+    has actually changed.
+
+    Several tills can edit one menu. Journal appends and compaction hold an
+    exclusive lock on a ``.lock`` file next to menu.txt, and compaction
+    replays the files on disk under that lock rather than trusting this
+    store's copy, so an edit made by another till is never lost.
+    """
+
+    def __init__(self, menu_file, journal_file=None, compact_after=200):
+        self.menu_file = menu_file
+        self.journal_file = journal_file or menu_file + ".journal"
+        self.cache_file = menu_file + ".cache"
+        self.signature = None
+        self.compact_after = compact_after
+        self.journal_records = 0
+        self.menu = {}
+        # Opened by the first write; readers never need it
+        self._file_lock = None
+
+    @contextlib.contextmanager
+    def write_lock(self):
+        """Keep every other till out of menu.txt and its journal."""
+        if self._file_lock is None:
+            self._file_lock = open_lock_file(self.menu_file + ".lock")
+        with locked(self._file_lock):
+            yield
+
+    def load(self, repair=True):
+        """Read the snapshot and replay the journal; returns self.menu.
+
+        With repair=False a torn last journal line is skipped but left in
+        place, for readers that must not write to the files.
+        """
+        menu, self.journal_records, good_end = self._read()
+        if repair and good_end is not None and os.path.getsize(self.journal_file) > good_end:
+            # Drop a torn last line left by a crash mid-append so the next
+            # record does not get glued onto it. Another till may just be
+            # finishing that line, so look again under the lock.
+            with self.write_lock():
+                menu, self.journal_records, good_end = self._read()
+                if os.path.getsize(self.journal_file) > good_end:
+                    with open(self.journal_file, "r+b") as f:
+                        f.truncate(good_end)
+        self.menu.clear()
+        self.menu.update(menu)
+        self.signature = self.current_signature()
+        return self.menu
+
+    def _read(self):
+        """The menu on disk, the number of journal records and where they end."""
+        signature = file_signature(self.menu_file)
+        cached = read_cache(self.cache_file, signature)
+        if cached is None:
+            snapshot, generation = read_snapshot_generation(self.menu_file)
+            try:
+                write_cache(self.cache_file, signature, snapshot, generation)
+            except OSError:
+                pass
+        else:
+            generation, snapshot = cached
+        menu = dict(snapshot)
+        records = 0
+        good_end = None
+        if self._journal_generation() == generation:
+            good_end = 0
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    good_end = f.tell()
+                    try:
+                        change = json.loads(line)
+                        if change["op"] == "generation":
+                            continue
+                        apply_change(menu, change)
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    records += 1
+        return menu, records, good_end
+
+    def _journal_generation(self):
+        """The generation the journal was begun on, or None if there is none.
+
+        A journal without a generation record, from before they were kept,
+        counts as generation 0.
+        """
+        try:
+            with open(self.journal_file, "rb") as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return None
+        if not first.endswith(b"\n"):
+            return None
+        try:
+            change = json.loads(first)
+            return change["generation"] if change["op"] == "generation" else 0
+        except (ValueError, KeyError, TypeError):
+            return 0
+
+    def _start_journal(self, generation):
+        """Replace the journal with an empty one begun on this generation."""
+        tmp = f"{self.journal_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "generation", "generation": generation}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_file)
+
+    def current_signature(self):
+        journal = file_signature(self.journal_file) if os.path.exists(self.journal_file) else None
+        return file_signature(self.menu_file), journal
+
+    def _record(self, change):
+        with self.write_lock():
+            generation = snapshot_generation(self.menu_file)
+            if self._journal_generation() != generation:
+                # Missing, or left over from before the last compaction
+                self._start_journal(generation)
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(change) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            # Only once the edit is on disk, so a failed write changes nothing
+            apply_change(self.menu, change)
+            self.journal_records += 1
+            if self.journal_records > self.compact_after or not os.path.exists(self.menu_file):
+                self._compact()
+        self.signature = self.current_signature()
+
+    def add(self, flavor, price):
+        self._record({"op": "add", "flavor": flavor, "price": price})
+
+    def rename(self, old, new):
+        self._record({"op": "rename", "old": old, "new": new})
+
+    def reprice(self, flavor, price):
+        self._record({"op": "reprice", "flavor": flavor, "price": price})
+
+    def compact(self):
+        """Fold the journal on disk into a fresh menu.txt."""
+        with self.write_lock():
+            self._compact()
+        self.signature = self.current_signature()
+
+    def replace(self, menu):
+        """Make menu the whole menu: a fresh menu.txt and an empty journal."""
+        with self.write_lock():
+            self._write(dict(menu))
+        self.menu.clear()
+        self.menu.update(menu)
+        self.signature = self.current_signature()
+
+    def _compact(self):
+        # Other tills may have journalled edits this store has not seen yet,
+        # so the snapshot is built from the files, not from self.menu
+        if os.path.exists(self.menu_file):
+            menu = self._read()[0]
+        else:
+            menu = dict(self.menu)
+        self._write(menu)
+
+    def _write(self, menu):
+        generation = snapshot_generation(self.menu_file) + 1
+        write_snapshot(self.menu_file, menu, generation)
+        # The new menu.txt must be on disk before the journal it replaces is
+        # emptied; until then the old journal no longer matches and is skipped
+        _fsync_directory(self.menu_file)
+        try:
+            write_cache(self.cache_file, file_signature(self.menu_file), menu, generation)
+        except OSError:
+            pass
+        self._start_journal(generation)
+        self.journal_records = 0
+
+
+def load_menu(filename="menu.txt"):
+    """Load a menu without any GUI; returns a flavor -> price dict."""
+    return MenuStore(filename).load()
@@ -0,0 +1,95 @@
+import tkinter as tk
+from tkinter import ttk
+
+ROW_HEIGHT = 30
+ROW_PADX = 5
+ROW_PADY = 2
+
+
+class MenuListView:
+    """Scrollable flavour list that only draws the rows in view.
+
+    Rows are canvas items taken from a small pool sized to the viewport. On
+    every scroll or resize the pool is moved to the visible positions and
+    relabelled, so the cost of opening or scrolling the menu does not depend
+    on how many flavours it has.
+    """
+
+    def __init__(self, parent, menu_items):
+        self.menu_items = menu_items
+        self.flavors = list(menu_items)
+        self.pool = []
+
+        self.canvas = tk.Canvas(parent, bg="#E3F2FD", highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.update_scrollregion()
+
+    def destroy(self):
+        self.canvas.destroy()
+        self.scrollbar.destroy()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.redraw()
+
+    def update_scrollregion(self):
+        height = len(self.flavors) * ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, 0, height))
+
+    def _make_row(self):
+        rect = self.canvas.create_rectangle(0, 0, 0, 0, fill="#E3F2FD", outline="#B0BEC5")
+        name = self.canvas.create_text(0, 0, anchor="w", font=("Arial", 11), fill="#4B4453")
+        price = self.canvas.create_text(0, 0, anchor="e", font=("Arial", 11, "bold"), fill="#2B2E4A")
+        return rect, name, price
+
+    def redraw(self):
+        width = self.canvas.winfo_width()
+        visible = self.canvas.winfo_height() // ROW_HEIGHT + 2
+        while len(self.pool) < visible:
+            self.pool.append(self._make_row())
+
+        first = max(int(self.canvas.canvasy(0)) // ROW_HEIGHT, 0)
+        for i, (rect, name, price) in enumerate(self.pool):
+            position = first + i
+            if position >= len(self.flavors):
+                for item in (rect, name, price):
+                    self.canvas.itemconfigure(item, state="hidden")
+                continue
+            flavor = self.flavors[position]
+            top = position * ROW_HEIGHT + ROW_PADY
+            bottom = top + ROW_HEIGHT - 2 * ROW_PADY
+            middle = (top + bottom) // 2
+            self.canvas.coords(rect, ROW_PADX, top, width - ROW_PADX, bottom)
+            self.canvas.coords(name, ROW_PADX + 10, middle)
+            self.canvas.coords(price, width - ROW_PADX - 10, middle)
+            self.canvas.itemconfigure(name, text=flavor, state="normal")
+            self.canvas.itemconfigure(price, text=f"Rs.{self.menu_items[flavor]:.2f}", state="normal")
+            self.canvas.itemconfigure(rect, state="normal")
+
+    def add(self, flavor):
+        self.flavors.append(flavor)
+        self.update_scrollregion()
+        self.redraw()
+
+    def update(self, old_flavor, new_flavor):
+        if new_flavor != old_flavor:
+            # A renamed flavour moves to the end of menu_items, so move its row too
+            del self.flavors[self.flavors.index(old_flavor)]
+            self.flavors.append(new_flavor)
+        self.redraw()
+
+    def sync(self, removed, updated):
+        """Apply a batch of removed and new or repriced flavors."""
+        for flavor in removed:
+            del self.flavors[self.flavors.index(flavor)]
+        shown = set(self.flavors) if updated else ()
+        for flavor in updated:
+            if flavor not in shown:
+                self.flavors.append(flavor)
+        self.update_scrollregion()
+        self.redraw()
@@ -0,0 +1,53 @@
+import threading
+
+from menu_store import MenuStore
+
+
+class MenuWatcher:
+    """Notices menu.txt edits made by other tills and reports just the delta.
+
+    A background thread stats menu.txt and its journal every ``interval``
+    seconds and sleeps in between, so it costs next to nothing while the menu
+    is unchanged. When either file moves it reloads the menu, diffs it
+    against the last version it saw and hands ``callback(removed, updated,
+    signature)`` to ``dispatch`` to be run on the Tk thread. ``updated`` maps
+    new or repriced flavors to their price, in menu order.
+    """
+
+    def __init__(self, menu_file, menu, signature, dispatch, callback, interval=2.0):
+        self.store = MenuStore(menu_file)
+        self.menu = dict(menu)
+        self.signature = signature
+        self.dispatch = dispatch
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="menu-watcher", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except (OSError, ValueError):
+                # menu.txt is being replaced right now; try again next tick
+                continue
+
+    def check(self):
+        signature = self.store.current_signature()
+        if signature == self.signature:
+            return
+        # Another till may be appending right now, so never trim the journal here
+        menu = dict(self.store.load(repair=False))
+        removed = [flavor for flavor in self.menu if flavor not in menu]
+        updated = {flavor: price for flavor, price in menu.items()
+                   if self.menu.get(flavor) != price}
+        self.menu = menu
+        self.signature = self.store.signature
+        if removed or updated:
+            self.dispatch(self.callback, removed, updated, self.signature)
@@ -0,0 +1,206 @@
+"""Latency histograms for the till's hot paths.
+
+Nothing here runs unless metrics are switched on: Metrics.instrument()
+replaces the chosen methods on one object with timed wrappers, so a till
+started without --metrics calls the plain methods and pays nothing.
+
+Each histogram has fixed log-scale buckets, four per doubling from one
+microsecond to about half an hour. Recording a sample is a log2 and a
+couple of additions, and percentiles are read from the bucket counts to
+within about 10%, so memory and cost stay the same however many samples
+come in. Calls are also counted per second over the last minute, for a
+calls (and orders) per minute rate.
+
+Snapshots can be written as JSON or in the Prometheus text format; a
+.prom file can be picked up by node_exporter's textfile collector.
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+BUCKETS_PER_DOUBLING = 4
+SMALLEST = 1e-6
+BUCKET_COUNT = 31 * BUCKETS_PER_DOUBLING
+QUANTILES = (0.5, 0.95, 0.99)
+RATE_WINDOW = 60
+_log2 = math.log2
+
+
+def bucket_value(i):
+    """Geometric middle of bucket i, in seconds."""
+    return SMALLEST * 2 ** ((i + 0.5) / BUCKETS_PER_DOUBLING)
+
+
+def quantile(buckets, count, largest, q):
+    """Estimate the q-quantile from bucket counts (never above the largest sample)."""
+    if not count:
+        return 0.0
+    rank = q * count
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return min(bucket_value(i), largest)
+    return largest
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        # Calls per second for the last minute, as a ring indexed by second
+        self.seconds = [0] * RATE_WINDOW
+        self.counts = [0] * RATE_WINDOW
+        # Receipts are timed on the worker threads
+        self._lock = threading.Lock()
+
+    def record(self, seconds, now=None):
+        """Add one sample; ``now`` is a time.perf_counter() reading, if at hand."""
+        second = int(time.perf_counter() if now is None else now)
+        slot = second % RATE_WINDOW
+        bucket = int(_log2(seconds / SMALLEST) * BUCKETS_PER_DOUBLING) if seconds > SMALLEST else 0
+        if bucket >= BUCKET_COUNT:
+            bucket = BUCKET_COUNT - 1
+        with self._lock:
+            self.buckets[bucket] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+            if self.seconds[slot] != second:
+                self.seconds[slot] = second
+                self.counts[slot] = 0
+            self.counts[slot] += 1
+
+    def per_minute(self, now=None):
+        """Calls recorded in the last minute."""
+        second = int(time.perf_counter() if now is None else now)
+        with self._lock:
+            return sum(n for s, n in zip(self.seconds, self.counts) if second - s < RATE_WINDOW)
+
+    def quantile(self, q):
+        with self._lock:
+            return quantile(self.buckets, self.count, self.max, q)
+
+    def summary(self):
+        rate = self.per_minute()
+        with self._lock:
+            buckets, count, total, largest = list(self.buckets), self.count, self.sum, self.max
+        summary = {"count": count, "sum": total, "max": largest, "per_minute": rate}
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = quantile(buckets, count, largest, q)
+        return summary
+
+
+class Metrics:
+    """Named latency histograms plus helpers to time methods and export them.
+
+    ``orders_from`` names the timer that runs once per order placed; its
+    rate is reported as orders per minute.
+    """
+
+    def __init__(self, orders_from="save_order_to_file"):
+        self.orders_from = orders_from
+        self.histograms = {}
+        self.started = time.time()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def timed(self, name, fn):
+        """Return fn wrapped so every call is recorded under name."""
+        record = self.histogram(name).record
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = clock()
+                record(end - start, end)
+
+        return wrapper
+
+    def instrument(self, obj, *names):
+        """Time the named methods of obj (this one object only).
+
+        Widgets keep the bound method they were given, so call this before
+        any button or binding is pointed at them.
+        """
+        for name in names:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def snapshot(self):
+        orders = self.histograms.get(self.orders_from)
+        return {"time": time.time(), "uptime": time.time() - self.started,
+                "orders_per_minute": orders.per_minute() if orders else 0,
+                "timers": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}}
+
+    def prometheus_text(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        lines = ["# HELP velvet_cone_latency_seconds Time spent in each instrumented operation.",
+                 "# TYPE velvet_cone_latency_seconds summary"]
+        for name, timer in snapshot["timers"].items():
+            for q in QUANTILES:
+                lines.append(f'velvet_cone_latency_seconds{{op="{name}",quantile="{q:g}"}} '
+                             f'{timer[f"p{q * 100:g}"]:.9g}')
+            lines.append(f'velvet_cone_latency_seconds_sum{{op="{name}"}} {timer["sum"]:.9g}')
+            lines.append(f'velvet_cone_latency_seconds_count{{op="{name}"}} {timer["count"]}')
+        lines += ["# HELP velvet_cone_orders_per_minute Orders placed on this till in the last minute.",
+                  "# TYPE velvet_cone_orders_per_minute gauge",
+                  f"velvet_cone_orders_per_minute {snapshot['orders_per_minute']:g}"]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename):
+        """Write a snapshot to filename: Prometheus text for .prom, else JSON."""
+        snapshot = self.snapshot()
+        if filename.endswith(".prom"):
+            data = self.prometheus_text(snapshot)
+        else:
+            data = json.dumps(snapshot, indent=2)
+        tmp = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, filename)
+
+
+class MetricsDumper:
+    """Writes a metrics snapshot to a file every ``interval`` seconds.
+
+    Runs on its own thread so the file keeps updating even while the Tk
+    thread is stuck, which is when it is most wanted.
+    """
+
+    def __init__(self, metrics, filename, interval=15.0):
+        self.metrics = metrics
+        self.filename = filename
+        self.interval = interval
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-dumper", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.metrics.dump(self.filename)
+        except OSError:
+            pass
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.metrics.dump(self.filename)
+            except OSError:
+                continue
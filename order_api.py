@@ -0,0 +1,207 @@
+"""Local HTTP/JSON ordering API for kiosks and delivery tablets.
+
+    python order_api.py --port 8080
+
+Endpoints:
+
+    GET  /menu     flavors and container prices
+    POST /quote    price a request without placing it
+    POST /orders   place an order ({"receipt": true} also archives the PDF)
+
+A cart is one request with an "items" list of {"flavor", "scoops",
+"container"} objects in place of the single flavor, scoops and container.
+
+Requests and responses are JSON; a rejected request gets a 400 with
+{"errors": [{"field": ..., "message": ...}]}. Validation and pricing run
+on the event loop, while order ids, writes to the order log and PDF
+rendering run in worker threads so one slow disk write never stalls other
+connections.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+
+from menu_store import MenuStore
+from menu_watcher import MenuWatcher
+from order_service import OrderError, OrderService
+from order_store import OrderStore, OrderWriter
+from pricing import CONTAINER_PRICES
+
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class OrderAPI:
+    def __init__(self, service, menu_store=None, receipt_workers=2):
+        self.service = service
+        self.menu_store = menu_store
+        # Several threads wait on the group-commit writer at once, so orders
+        # that arrive together share one fsync
+        self.store_executor = concurrent.futures.ThreadPoolExecutor(16, thread_name_prefix="order-store")
+        self.receipt_executor = concurrent.futures.ThreadPoolExecutor(receipt_workers,
+                                                                      thread_name_prefix="receipt")
+        self.menu_watcher = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.loop = asyncio.get_running_loop()
+        if self.menu_store is not None:
+            self.menu_watcher = MenuWatcher(self.menu_store.menu_file, self.service.menu_items,
+                                            self.menu_store.signature,
+                                            self.loop.call_soon_threadsafe, self.apply_menu_changes)
+            self.menu_watcher.start()
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    def close(self):
+        if self.menu_watcher is not None:
+            self.menu_watcher.stop()
+        self.server.close()
+        self.store_executor.shutdown(wait=True)
+        self.receipt_executor.shutdown(wait=True)
+        self.service.store.close()
+
+    def apply_menu_changes(self, removed, updated, signature):
+        menu = self.service.menu_items
+        if not updated and len(removed) == len(menu):
+            return
+        for flavor in removed:
+            menu.pop(flavor, None)
+        menu.update(updated)
+        self.service.quote_engine.invalidate()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = headers.get("content-length", "0")
+                    # The body is left unread on either error, so the
+                    # connection can't be reused after the response
+                    if not (length.isascii() and length.isdigit()):
+                        keep_alive = False
+                        raise HTTPError(400, f"Invalid Content-Length: {length}")
+                    length = int(length)
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, path.split("?", 1)[0], body)
+                except HTTPError as e:
+                    status, payload = e.status, {"errors": [{"field": None, "message": str(e)}]}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    status, payload = 500, {"errors": [{"field": None, "message": str(e)}]}
+                    keep_alive = False
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        if path == "/menu":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return 200, {"menu": self.service.menu_items, "containers": self.service.container_prices}
+        if path not in ("/quote", "/orders"):
+            raise HTTPError(404, f"No such endpoint: {path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "Expected a JSON object")
+
+        try:
+            if path == "/quote":
+                total, summary = self.service.quote(request)
+                return 200, {"total": total, "summary": summary}
+            errors = self.service.validate(request)
+            if errors:
+                raise OrderError(errors)
+        except OrderError as e:
+            return 400, {"errors": e.errors}
+
+        # The id counter is locked and fsynced, so allocate off the event loop too
+        order_id = await self.loop.run_in_executor(self.store_executor, self.service.order_ids.next_id)
+        order = self.service.build_order(request, order_id)
+        await self.loop.run_in_executor(self.store_executor, self.service.store.append, order)
+        if request.get("receipt") and self.service.render_receipt is not None:
+            await self.loop.run_in_executor(self.receipt_executor, self.service.render_receipt, order)
+        return 201, {"order": order}
+
+
+def create_api(menu_file="menu.txt", orders_file="all_orders.log", receipts=True):
+    menu_store = MenuStore(menu_file)
+    menu_store.load()
+    render_receipt = None
+    if receipts:
+        from receipt_archive import ReceiptArchive
+        render_receipt = ReceiptArchive().add
+    store = OrderStore(orders_file)
+    service = OrderService(menu_store.menu, dict(CONTAINER_PRICES), OrderWriter(store, mode="group"),
+                           render_receipt=render_receipt)
+    return OrderAPI(service, menu_store)
+
+
+async def serve(args):
+    api = create_api(args.menu, args.orders_file, receipts=not args.no_receipts)
+    server = await api.start(args.host, args.port)
+    print(f"Velvet Cone ordering API on http://{args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--menu", default="menu.txt")
+    parser.add_argument("--orders-file", default="all_orders.log")
+    parser.add_argument("--no-receipts", action="store_true", help="never render PDF receipts")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
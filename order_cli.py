@@ -0,0 +1,115 @@
+"""Place orders from a JSONL or CSV file (or stdin) without the GUI.
+
+Each input record has the fields name, phone, flavor, scoops, container,
+payment, delivery and, where needed, address and card_number; a JSONL
+record may instead carry an "items" list to place a whole cart as one
+order. One JSON result line is written to stdout per record:
+
+    {"line": 3, "ok": true, "order_id": 1234, "total": 310.0}
+    {"line": 4, "ok": false, "errors": [{"field": "phone", "message": "..."}]}
+
+Examples:
+
+    python order_cli.py phone_orders.csv
+    python order_cli.py --format jsonl - < orders.jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+from menu_store import MenuStore
+from order_service import OrderError, OrderService
+from order_store import DURABILITY_MODES, OrderStore, OrderWriter
+from pricing import CONTAINER_PRICES
+
+
+def read_requests(stream, fmt):
+    if fmt == "csv":
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            yield line, row
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError as e:
+            yield line, e
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="orders file, or - for stdin")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="input format (default: from the file extension, else jsonl)")
+    parser.add_argument("--menu", default="menu.txt")
+    parser.add_argument("--orders-file", default="all_orders.log")
+    parser.add_argument("--receipts", action="store_true",
+                        help="also add a PDF receipt per order to the receipts/ archive")
+    parser.add_argument("--durability", choices=DURABILITY_MODES, default="async",
+                        help="how each order is committed (default: async, flushed at the end)")
+    parser.add_argument("--errors-only", action="store_true", help="only print failed records")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    menu_store = MenuStore(args.menu)
+    menu_store.load()
+    render_receipt = None
+    if args.receipts:
+        from receipt_archive import ReceiptArchive
+        render_receipt = ReceiptArchive().add
+    store = OrderStore(args.orders_file)
+    writer = OrderWriter(store, mode=args.durability)
+    service = OrderService(menu_store.menu, dict(CONTAINER_PRICES), writer,
+                           render_receipt=render_receipt)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    placed = failed = 0
+    write_error = None
+    start = time.perf_counter()
+    out = sys.stdout
+    try:
+        for line, request in read_requests(stream, fmt):
+            if isinstance(request, Exception):
+                result = {"line": line, "ok": False,
+                          "errors": [{"field": None, "message": f"Invalid JSON: {request}"}]}
+            elif not isinstance(request, dict):
+                result = {"line": line, "ok": False,
+                          "errors": [{"field": None, "message": "Expected a JSON object"}]}
+            else:
+                try:
+                    order = service.place(request, receipt=args.receipts)
+                    result = {"line": line, "ok": True, "order_id": order["order_id"],
+                              "total": order["total"]}
+                except OrderError as e:
+                    result = {"line": line, "ok": False, "errors": e.errors}
+            if result["ok"]:
+                placed += 1
+                if args.errors_only:
+                    continue
+            else:
+                failed += 1
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        try:
+            writer.flush()
+        except Exception as e:
+            # Reported below rather than as a traceback; any error already
+            # on its way out of the loop still goes first
+            write_error = e
+        writer.close()
+    elapsed = time.perf_counter() - start
+    rate = (placed + failed) / elapsed if elapsed else 0.0
+    print(f"{placed} placed, {failed} failed in {elapsed:.2f}s ({rate:.0f} orders/s)", file=sys.stderr)
+    if write_error is not None:
+        print(f"Some orders were not written to {args.orders_file}: {write_error}", file=sys.stderr)
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""Columnar export of the order history, memory-mapped back for fast scans.
+
+    python order_columns.py export all_orders.log orders.columns
+    python order_columns.py export all_orders.txt.migrated orders.columns
+    python order_columns.py import orders.columns restored.log
+
+An export is a directory with one raw little-endian file per column and a
+meta.json describing them. Flavor, container, payment and delivery are
+dictionary-encoded as 2-byte codes, numbers are fixed width and the free
+text fields (name, phone, address, card number, and the item list of a
+cart order as compact JSON) are a UTF-8 blob plus an offsets array. The
+summary text is not stored: it is rebuilt with pricing.build_summary or
+build_cart_summary when orders are read back, exactly as it was made.
+
+Orders are converted a chunk at a time, so memory stays flat however big
+the source is, and OrderColumns maps the files with numpy.memmap so a scan
+only touches the columns it uses.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+
+from order_store import OrderStore, OrderWriter, TIMESTAMP_FORMAT, timestamp_to_epoch
+from pricing import build_cart_summary, build_summary
+
+# Version 1 exports predate cart orders and have no items column
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+NUMERIC = {"order_id": "<i8", "timestamp": "<f8", "scoops": "<i1", "total": "<f8"}
+CATEGORIES = ("flavor", "container", "payment", "delivery")
+CODE_DTYPE = "<u2"
+STRINGS = ("customer_name", "phone", "address", "card_number", "items")
+
+
+def read_text_orders(text_file):
+    """Yield orders from the old str(dict)-per-line file, skipping bad lines."""
+    import ast
+
+    with open(text_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield ast.literal_eval(line.strip())
+            except Exception:
+                continue
+
+
+def read_log_orders(log_file, chunk=65536):
+    store = OrderStore(log_file)
+    for start in range(0, len(store), chunk):
+        yield from store.read(start, start + chunk)
+
+
+def chunked(orders, size):
+    chunk = []
+    for order in orders:
+        chunk.append(order)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ColumnWriter:
+    """Appends chunks of orders to a new column directory.
+
+    Everything is written to ``directory + ".tmp"`` and only renamed into
+    place by close(), so a half-finished export is never mistaken for a
+    complete one.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tmp = directory + ".tmp"
+        if os.path.exists(self.tmp):
+            shutil.rmtree(self.tmp)
+        os.makedirs(self.tmp)
+        self.count = 0
+        self.vocabularies = {name: {} for name in CATEGORIES}
+        self.text_sizes = dict.fromkeys(STRINGS, 0)
+        self.files = {}
+        for name in list(NUMERIC) + list(CATEGORIES):
+            self.files[name] = open(os.path.join(self.tmp, name + ".bin"), "wb")
+        for name in STRINGS:
+            self.files[name] = open(os.path.join(self.tmp, name + ".bin"), "wb")
+            self.files[name + ".offsets"] = open(os.path.join(self.tmp, name + ".offsets.bin"), "wb")
+            self.files[name + ".offsets"].write(np.zeros(1, dtype="<i8").tobytes())
+
+    def _code(self, name, value):
+        vocabulary = self.vocabularies[name]
+        code = vocabulary.get(value)
+        if code is None:
+            if len(vocabulary) > np.iinfo(CODE_DTYPE).max:
+                raise ValueError(f"too many distinct {name} values to encode")
+            code = vocabulary[value] = len(vocabulary)
+        return code
+
+    def write(self, orders):
+        numbers = {name: [] for name in NUMERIC}
+        codes = {name: [] for name in CATEGORIES}
+        texts = {name: [] for name in STRINGS}
+        for order in orders:
+            numbers["order_id"].append(int(order["order_id"]))
+            numbers["timestamp"].append(timestamp_to_epoch(order.get("timestamp")))
+            numbers["scoops"].append(int(order.get("scoops") or 0))
+            numbers["total"].append(float(order.get("total") or 0))
+            for name in CATEGORIES:
+                codes[name].append(self._code(name, str(order.get(name) or "")))
+            for name in STRINGS[:-1]:
+                texts[name].append(str(order.get(name) or "").encode("utf-8"))
+            items = order.get("items")
+            texts["items"].append(json.dumps(items, separators=(",", ":")).encode("utf-8") if items else b"")
+
+        for name, dtype in NUMERIC.items():
+            self.files[name].write(np.asarray(numbers[name], dtype=dtype).tobytes())
+        for name in CATEGORIES:
+            self.files[name].write(np.asarray(codes[name], dtype=CODE_DTYPE).tobytes())
+        for name in STRINGS:
+            lengths = np.fromiter((len(text) for text in texts[name]), dtype="<i8", count=len(texts[name]))
+            offsets = self.text_sizes[name] + np.cumsum(lengths)
+            self.files[name].write(b"".join(texts[name]))
+            self.files[name + ".offsets"].write(offsets.tobytes())
+            self.text_sizes[name] = int(offsets[-1]) if len(offsets) else self.text_sizes[name]
+        self.count += len(orders)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        meta = {"version": FORMAT_VERSION, "count": self.count, "numeric": NUMERIC,
+                "code_dtype": CODE_DTYPE, "strings": list(STRINGS),
+                "categories": {name: list(vocabulary) for name, vocabulary in self.vocabularies.items()}}
+        with open(os.path.join(self.tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
+        os.replace(self.tmp, self.directory)
+
+
+def export_columns(orders, directory, chunk=65536):
+    """Write an iterable of orders to a column directory; returns the count."""
+    writer = ColumnWriter(directory)
+    try:
+        for batch in chunked(orders, chunk):
+            writer.write(batch)
+    except BaseException:
+        for f in writer.files.values():
+            f.close()
+        shutil.rmtree(writer.tmp, ignore_errors=True)
+        raise
+    writer.close()
+    return writer.count
+
+
+def _map(path, dtype, count):
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+class OrderColumns:
+    """Read-only, memory-mapped view of an exported column directory.
+
+    ``columns[name]`` is a numpy array for every numeric and category
+    column (categories as codes into ``categories[name]``).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") not in READABLE_VERSIONS:
+            raise ValueError(f"unsupported column format version {meta.get('version')}")
+        self.count = meta["count"]
+        self.categories = meta["categories"]
+        self.columns = {}
+        for name, dtype in meta["numeric"].items():
+            self.columns[name] = _map(os.path.join(directory, name + ".bin"), dtype, self.count)
+        for name in self.categories:
+            self.columns[name] = _map(os.path.join(directory, name + ".bin"), meta["code_dtype"], self.count)
+        self._offsets = {}
+        self._texts = {}
+        for name in meta["strings"]:
+            self._offsets[name] = _map(os.path.join(directory, name + ".offsets.bin"), "<i8", self.count + 1)
+            size = int(self._offsets[name][-1]) if self.count else 0
+            self._texts[name] = _map(os.path.join(directory, name + ".bin"), np.uint8, size)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decoded(self, name, start=0, stop=None):
+        """Category values for rows start..stop-1 as a numpy string array."""
+        return np.asarray(self.categories[name])[self.columns[name][start:stop]]
+
+    def strings(self, name, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        offsets = self._offsets[name][start:stop + 1]
+        if len(offsets) < 2:
+            return []
+        base = int(offsets[0])
+        data = self._texts[name][base:int(offsets[-1])].tobytes()
+        edges = (offsets - base).tolist()
+        return [data[edges[i]:edges[i + 1]].decode("utf-8") for i in range(len(edges) - 1)]
+
+    def orders(self, start=0, stop=None):
+        """Rebuild rows start..stop-1 as order dicts like the ones in the log."""
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return []
+        numbers = {name: self.columns[name][start:stop].tolist() for name in NUMERIC}
+        categories = {name: self.decoded(name, start, stop).tolist() for name in CATEGORIES}
+        texts = {name: self.strings(name, start, stop) for name in self._texts}
+        carts = texts.get("items") or [""] * (stop - start)
+        orders = []
+        for i in range(stop - start):
+            payment, delivery = categories["payment"][i], categories["delivery"][i]
+            address, card_number = texts["address"][i], texts["card_number"][i]
+            items = json.loads(carts[i]) if carts[i] else None
+            order = {
+                "order_id": numbers["order_id"][i],
+                "customer_name": texts["customer_name"][i],
+                "phone": texts["phone"][i],
+                "flavor": categories["flavor"][i],
+                "scoops": numbers["scoops"][i],
+                "container": categories["container"][i],
+                "payment": payment,
+                "delivery": delivery,
+                "total": numbers["total"][i],
+                "timestamp": datetime.datetime.fromtimestamp(numbers["timestamp"][i]).strftime(TIMESTAMP_FORMAT),
+            }
+            if items:
+                lines = [(item["flavor"], item["scoops"], item["container"], item["price"]) for item in items]
+                order["summary"] = build_cart_summary(order["customer_name"], lines, payment, delivery,
+                                                      order["total"], address, card_number)
+            else:
+                order["summary"] = build_summary(order["customer_name"], order["flavor"], order["scoops"],
+                                                 order["container"], payment, delivery, order["total"],
+                                                 address, card_number)
+            if address:
+                order["address"] = address
+            if card_number:
+                order["card_number"] = card_number
+            if items:
+                order["items"] = items
+            orders.append(order)
+        return orders
+
+    def iter_orders(self, chunk=65536):
+        for start in range(0, self.count, chunk):
+            yield from self.orders(start, start + chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="convert an order log or old text file to columns")
+    export.add_argument("source", help="all_orders.log, or an old all_orders.txt")
+    export.add_argument("directory")
+    restore = commands.add_parser("import", help="append exported orders to an order log")
+    restore.add_argument("directory")
+    restore.add_argument("log_file")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        if args.source.endswith(".log"):
+            orders = read_log_orders(args.source)
+        else:
+            orders = read_text_orders(args.source)
+        count = export_columns(orders, args.directory)
+        print(f"Exported {count} orders to {args.directory}")
+    else:
+        columns = OrderColumns(args.directory)
+        writer = OrderWriter(OrderStore(args.log_file), mode="async")
+        try:
+            for order in columns.iter_orders():
+                writer.append(order)
+            writer.flush()
+        finally:
+            writer.close()
+        print(f"Imported {len(columns)} orders into {args.log_file}")
+
+
+if __name__ == "__main__":
+    main()
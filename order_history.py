@@ -0,0 +1,77 @@
+import collections
+
+
+class OrderHistory:
+    """List-like view of the order log that keeps only recent orders in memory.
+
+    The newest ``window`` orders are held in a deque; anything older is read
+    from the store on demand, newest first, so memory stays flat however many
+    orders have been placed. Call refresh() to follow orders other tills
+    append to a shared store.
+    """
+
+    def __init__(self, store, window=256, chunk=1024):
+        self.store = store
+        self.window = window
+        self.chunk = chunk
+        self._count = len(store)
+        self._recent = collections.deque(store.tail(window), maxlen=window)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def append(self, order):
+        self._recent.append(order)
+        self._count += 1
+
+    def refresh(self):
+        """Pick up orders appended to the store since we last looked.
+
+        Covers orders placed by other tills sharing the store. Only the part
+        of the log past our own count is read (at most ``window`` orders),
+        so this is cheap to call often. Returns the number of new orders.
+        """
+        orders, count = self.store.read_since(self._count, limit=self.window)
+        new = count - self._count
+        self._recent.extend(orders)
+        self._count = count
+        return new
+
+    def _first_cached(self):
+        return self._count - len(self._recent)
+
+    def _read(self, start, stop):
+        # Serve what we can from the window and read the older part from disk.
+        first_cached = self._first_cached()
+        orders = []
+        if start < first_cached:
+            orders.extend(self.store.read(start, min(stop, first_cached)))
+        for position in range(max(start, first_cached), stop):
+            orders.append(self._recent[position - first_cached])
+        return orders
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._count)
+            if step == 1:
+                return self._read(start, stop) if start < stop else []
+            return [self[i] for i in range(start, stop, step)]
+        if key < 0:
+            key += self._count
+        if not 0 <= key < self._count:
+            raise IndexError("order history index out of range")
+        return self._read(key, key + 1)[0]
+
+    def __iter__(self):
+        for start in range(0, self._count, self.chunk):
+            yield from self._read(start, min(start + self.chunk, self._count))
+
+    def __reversed__(self):
+        stop = self._count
+        while stop > 0:
+            start = max(stop - self.chunk, 0)
+            yield from reversed(self._read(start, stop))
+            stop = start
@@ -0,0 +1,64 @@
+import os
+import struct
+import threading
+
+from file_lock import locked, open_lock_file
+
+# Old orders used random ids between 1000 and 9999, so sequential ids start
+# above that range and can never collide with them
+FIRST_SEQUENTIAL_ID = 10000
+COUNTER = struct.Struct("<q")
+# Ids reserved per trip to the counter file
+ID_BLOCK = 32
+
+
+class OrderIdAllocator:
+    """Hands out increasing order ids from a counter file next to the order log.
+
+    Ids are reserved ``block`` at a time: the counter file is locked, moved
+    past the block, fsynced and unlocked, and the block is then handed out
+    from memory. Several tills sharing one store never get the same id, and
+    only one order in ``block`` pays for the lock and the fsync. Ids left in
+    a block when a till closes are never used, and ids from different tills
+    interleave in the log. The counter never goes below the last id in the
+    order log, so a counter write lost in a crash cannot hand out an id
+    that is already in the log.
+    """
+
+    def __init__(self, counter_file, last_known_id=0, block=ID_BLOCK):
+        self.counter_file = counter_file
+        self.last_known_id = last_known_id
+        self.block = block
+        self._lock = threading.Lock()
+        self._file = open_lock_file(counter_file)
+        # The reserved ids not handed out yet are _next.._end
+        self._next = 1
+        self._end = 0
+
+    @classmethod
+    def for_store(cls, store):
+        counter_file = os.path.splitext(store.log_file)[0] + ".seq"
+        return cls(counter_file, store.last_order_id())
+
+    def next_id(self):
+        with self._lock:
+            if self._next > self._end:
+                self._reserve()
+            order_id = self._next
+            self._next += 1
+            return order_id
+
+    def _reserve(self):
+        with locked(self._file) as f:
+            f.seek(0)
+            data = f.read(COUNTER.size)
+            last = COUNTER.unpack(data)[0] if len(data) == COUNTER.size else 0
+            first = max(last, self.last_known_id, FIRST_SEQUENTIAL_ID - 1) + 1
+            end = first + self.block - 1
+            f.seek(0)
+            f.write(COUNTER.pack(end))
+            os.fsync(f.fileno())
+        self._next, self._end = first, end
+
+    def close(self):
+        self._file.close()
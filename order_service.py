@@ -0,0 +1,194 @@
+import datetime
+
+from order_ids import OrderIdAllocator
+from pricing import Quote, QuoteEngine
+
+PAYMENT_METHODS = ("Cash", "Card")
+DELIVERY_METHODS = ("Takeaway", "Delivery")
+# Fields that affect the price and summary, i.e. what a quote needs
+QUOTE_FIELDS = ("flavor", "scoops", "container", "payment", "delivery", "items")
+MAX_CART_ITEMS = 50
+
+
+class OrderError(Exception):
+    """Raised when an order request does not validate.
+
+    ``errors`` is a list of {"field": ..., "message": ...} dicts, in the
+    order the GUI would report them.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors[0]["message"] if errors else "Invalid order")
+        self.errors = errors
+
+
+def _error(field, message):
+    return {"field": field, "message": message}
+
+
+def _whole_number(value):
+    # JSON gives ints, CSV gives strings; 2.7 or true are not a number of scoops
+    if isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+class OrderService:
+    """Validates, prices and records orders without any GUI.
+
+    A request is a plain dict with name, phone, flavor, scoops, container,
+    payment, delivery and optionally address and card_number, e.g. one line
+    of a JSONL file or one row of a CSV file.
+
+    A cart request has an "items" list of {"flavor", "scoops", "container"}
+    dicts instead of the single flavor, scoops and container. It becomes one
+    order record whose top-level flavor, scoops and container describe the
+    first item, so older readers still see a valid order, and whose "items"
+    list holds every line with its price.
+    """
+
+    def __init__(self, menu_items, container_prices, store, quote_engine=None, render_receipt=None,
+                 order_ids=None):
+        self.menu_items = menu_items
+        self.container_prices = container_prices
+        self.store = store
+        self.quote_engine = quote_engine or QuoteEngine(menu_items, container_prices)
+        self.order_ids = order_ids or OrderIdAllocator.for_store(store)
+        self.render_receipt = render_receipt
+
+    def validate(self, request):
+        """Return a list of problems with the request; empty if it is valid."""
+        errors = []
+        name = str(request.get("name") or "")
+        phone = str(request.get("phone") or "")
+        if not name:
+            errors.append(_error("name", "Please enter your name"))
+        if not phone:
+            errors.append(_error("phone", "Please enter your phone number"))
+        if any(char.isdigit() for char in name):
+            errors.append(_error("name", "Name should not contain numbers."))
+        if any(char.isalpha() for char in phone):
+            errors.append(_error("phone", "Phone number should not contain letters."))
+
+        payment = request.get("payment", "Cash")
+        if payment not in PAYMENT_METHODS:
+            errors.append(_error("payment", f"Unknown payment method: {payment}"))
+        elif payment == "Card" and not str(request.get("card_number") or "").strip():
+            errors.append(_error("card_number", "Please enter your card number"))
+
+        delivery = request.get("delivery", "Takeaway")
+        if delivery not in DELIVERY_METHODS:
+            errors.append(_error("delivery", f"Unknown delivery method: {delivery}"))
+        elif delivery == "Delivery" and not str(request.get("address") or "").strip():
+            errors.append(_error("address", "Please enter delivery address"))
+
+        if "items" not in request:
+            self._validate_item(request, "", "", errors)
+            return errors
+        items = request["items"]
+        if not isinstance(items, list) or not items:
+            errors.append(_error("items", "Please add at least one item to the cart"))
+        elif len(items) > MAX_CART_ITEMS:
+            errors.append(_error("items", f"A cart can hold at most {MAX_CART_ITEMS} items"))
+        else:
+            for i, item in enumerate(items):
+                if not isinstance(item, dict):
+                    errors.append(_error(f"items[{i}]", f"Item {i + 1}: expected an object"))
+                    continue
+                self._validate_item(item, f"items[{i}].", f"Item {i + 1}: ", errors)
+        return errors
+
+    def _validate_item(self, item, field_prefix, message_prefix, errors):
+        flavor = item.get("flavor")
+        if not isinstance(flavor, str) or flavor not in self.menu_items:
+            errors.append(_error(field_prefix + "flavor", f"{message_prefix}Unknown flavor: {flavor}"))
+        scoops = _whole_number(item.get("scoops", 1))
+        if scoops is None or not 1 <= scoops <= 3:
+            errors.append(_error(field_prefix + "scoops", f"{message_prefix}Scoops must be 1, 2 or 3."))
+        container = item.get("container", "Cup")
+        if not isinstance(container, str) or container not in self.container_prices:
+            errors.append(_error(field_prefix + "container", f"{message_prefix}Unknown container: {container}"))
+
+    def _items(self, request):
+        return tuple((item["flavor"], int(item.get("scoops", 1)), item.get("container", "Cup"))
+                     for item in request["items"])
+
+    def quote(self, request):
+        """Price a request without placing it; raises OrderError if it can't be priced."""
+        errors = [e for e in self.validate(request) if e["field"].split("[", 1)[0] in QUOTE_FIELDS]
+        if errors:
+            raise OrderError(errors)
+        if "items" in request:
+            quote = self.quote_engine.quote_cart(self._items(request), request.get("payment", "Cash"),
+                                                 request.get("delivery", "Takeaway"),
+                                                 address=str(request.get("address") or "").strip(),
+                                                 card_number=str(request.get("card_number") or ""),
+                                                 name=request.get("name") or "Customer")
+            return Quote(quote.total, quote.summary)
+        return self.quote_engine.quote(request["flavor"], int(request.get("scoops", 1)),
+                                       request.get("container", "Cup"),
+                                       request.get("payment", "Cash"),
+                                       request.get("delivery", "Takeaway"),
+                                       address=str(request.get("address") or "").strip(),
+                                       card_number=str(request.get("card_number") or ""),
+                                       name=request.get("name") or "Customer")
+
+    def build_order(self, request, order_id=None):
+        """Turn a validated request into an order record.
+
+        ``order_id`` is allocated here if not given; allocating locks and
+        fsyncs the id counter, so callers on an event loop do it elsewhere.
+        """
+        name = request["name"]
+        payment = request.get("payment", "Cash")
+        delivery = request.get("delivery", "Takeaway")
+        address = str(request.get("address") or "").strip()
+        card_number = str(request.get("card_number") or "")
+        items = None
+        if "items" in request:
+            total, summary, priced = self.quote_engine.quote_cart(self._items(request), payment, delivery,
+                                                                  address=address, card_number=card_number,
+                                                                  name=name)
+            flavor, scoops, container = priced[0][:3]
+            items = [{"flavor": f, "scoops": n, "container": c, "price": price}
+                     for f, n, c, price in priced]
+        else:
+            flavor = request["flavor"]
+            scoops = int(request.get("scoops", 1))
+            container = request.get("container", "Cup")
+            total, summary = self.quote_engine.quote(flavor, scoops, container, payment, delivery,
+                                                     address=address, card_number=card_number,
+                                                     name=name)
+        order = {
+            "order_id": self.order_ids.next_id() if order_id is None else order_id,
+            "customer_name": name,
+            "phone": request["phone"],
+            "flavor": flavor,
+            "scoops": scoops,
+            "container": container,
+            "payment": payment,
+            "delivery": delivery,
+            "total": total,
+            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "summary": summary
+        }
+        if delivery == "Delivery":
+            order["address"] = address
+        if payment == "Card":
+            order["card_number"] = card_number
+        if items is not None:
+            order["items"] = items
+        return order
+
+    def place(self, request, receipt=False):
+        """Validate, price and store one order; raises OrderError if invalid."""
+        errors = self.validate(request)
+        if errors:
+            raise OrderError(errors)
+        order = self.build_order(request)
+        self.store.append(order)
+        if receipt and self.render_receipt is not None:
+            self.render_receipt(order)
+        return order
@@ -0,0 +1,447 @@
+import contextlib
+import datetime
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+from file_lock import locked, open_lock_file
+from order_ids import FIRST_SEQUENTIAL_ID
+
+# Every record in the log is a 4-byte little-endian length followed by the
+# order encoded as UTF-8 JSON. The sidecar index holds one fixed-size entry
+# per record so the store can find the n-th order, or an order by id or
+# timestamp, without reading the log itself.
+RECORD_HEADER = struct.Struct("<I")
+INDEX_ENTRY = struct.Struct("<qdQI")  # order_id, timestamp, offset, length
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def timestamp_to_epoch(timestamp):
+    try:
+        return datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def encode_order(order):
+    payload = json.dumps(order, separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload)) + payload
+
+
+def decode_order(payload):
+    return json.loads(payload.decode("utf-8"))
+
+
+class OrderStore:
+    """Append-only order log with a fixed-width sidecar index.
+
+    Several tills on one machine can share a store. Writers take an
+    exclusive lock on a ``.lock`` file next to the log for the whole
+    append, so records never interleave; readers take no lock, since an
+    index entry is only written after its record and is never changed.
+    """
+
+    def __init__(self, log_file, index_file=None):
+        self.log_file = log_file
+        self.index_file = index_file or os.path.splitext(log_file)[0] + ".idx"
+        # Keeps a record and its index entry together when several threads
+        # append; the lock file does the same for other processes
+        self._lock = threading.Lock()
+        self._file_lock = open_lock_file(os.path.splitext(log_file)[0] + ".lock")
+        for path in (self.log_file, self.index_file):
+            if not os.path.exists(path):
+                open(path, "ab").close()
+        # Another till may be half way through an append, so only repair
+        # while holding the lock
+        with self.write_lock():
+            self._repair()
+
+    @contextlib.contextmanager
+    def write_lock(self):
+        """Keep every other writer, in this process or any other, out."""
+        with self._lock, locked(self._file_lock):
+            yield
+
+    def close(self):
+        self._file_lock.close()
+
+    def _repair(self):
+        # A crash between the log write and the index write leaves a partial
+        # entry, or records the index doesn't know about yet. The records
+        # carry their own length, so entries for them are rebuilt from the
+        # log; only a record that was not completely written is dropped.
+        index_size = os.path.getsize(self.index_file)
+        whole = index_size - index_size % INDEX_ENTRY.size
+        # Index entries are only written once their records are on disk, but
+        # drop any that point past the end of the log all the same
+        log_size = os.path.getsize(self.log_file)
+        count = whole // INDEX_ENTRY.size
+        end = 0
+        while count:
+            _, _, offset, length = self._read_entry(count - 1)
+            end = offset + RECORD_HEADER.size + length
+            if end <= log_size:
+                break
+            count -= 1
+            end = 0
+        if count * INDEX_ENTRY.size != index_size:
+            with open(self.index_file, "r+b") as f:
+                f.truncate(count * INDEX_ENTRY.size)
+        if log_size > end:
+            entries, end = self._scan_records(end, log_size)
+            if entries:
+                with open(self.index_file, "ab") as f:
+                    f.write(entries)
+                    f.flush()
+                    os.fsync(f.fileno())
+            if log_size > end:
+                with open(self.log_file, "r+b") as f:
+                    f.truncate(end)
+
+    def _scan_records(self, offset, log_size):
+        """Index entries for the whole records from offset on, and where they stop."""
+        entries = bytearray()
+        with open(self.log_file, "rb") as log:
+            log.seek(offset)
+            while offset + RECORD_HEADER.size <= log_size:
+                (length,) = RECORD_HEADER.unpack(log.read(RECORD_HEADER.size))
+                if offset + RECORD_HEADER.size + length > log_size:
+                    break
+                try:
+                    order = decode_order(log.read(length))
+                    order_id = int(order["order_id"])
+                except (ValueError, KeyError, TypeError):
+                    break
+                entries += INDEX_ENTRY.pack(order_id, timestamp_to_epoch(order.get("timestamp")),
+                                            offset, length)
+                offset += RECORD_HEADER.size + length
+        return entries, offset
+
+    def __len__(self):
+        return os.path.getsize(self.index_file) // INDEX_ENTRY.size
+
+    def _read_entry(self, position):
+        with open(self.index_file, "rb") as f:
+            f.seek(position * INDEX_ENTRY.size)
+            return INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+
+    def _read_entries(self, start, stop):
+        with open(self.index_file, "rb") as f:
+            f.seek(start * INDEX_ENTRY.size)
+            data = f.read((stop - start) * INDEX_ENTRY.size)
+        return list(INDEX_ENTRY.iter_unpack(data))
+
+    def append(self, order):
+        """Append one order and its index entry."""
+        record = encode_order(order)
+        with self.write_lock():
+            with open(self.log_file, "ab") as log:
+                offset = log.seek(0, os.SEEK_END)
+                log.write(record)
+            entry = INDEX_ENTRY.pack(int(order["order_id"]),
+                                     timestamp_to_epoch(order.get("timestamp")),
+                                     offset, len(record) - RECORD_HEADER.size)
+            with open(self.index_file, "ab") as index:
+                index.write(entry)
+
+    def read(self, start, stop=None):
+        """Return the orders at positions start..stop-1, oldest first."""
+        count = len(self)
+        stop = count if stop is None else min(stop, count)
+        start = max(start, 0)
+        if start >= stop:
+            return []
+        entries = self._read_entries(start, stop)
+        first = entries[0][2]
+        last = entries[-1][2] + RECORD_HEADER.size + entries[-1][3]
+        with open(self.log_file, "rb") as f:
+            f.seek(first)
+            data = f.read(last - first)
+        orders = []
+        for _, _, offset, length in entries:
+            begin = offset - first + RECORD_HEADER.size
+            orders.append(decode_order(data[begin:begin + length]))
+        return orders
+
+    def read_since(self, position, limit=None):
+        """Return (orders, new_position) for everything appended after position.
+
+        Lets a reader follow orders placed by other tills incrementally; with
+        ``limit`` only the newest ``limit`` of them are read.
+        """
+        count = len(self)
+        if limit is not None:
+            position = max(position, count - limit)
+        return self.read(position, count), count
+
+    def tail(self, n):
+        """Return the last n orders, oldest first."""
+        count = len(self)
+        return self.read(count - n, count)
+
+    def last_order_id(self):
+        count = len(self)
+        return self._read_entry(count - 1)[0] if count else 0
+
+    def find(self, order_id):
+        """Return the order with this id, or None."""
+        if order_id >= FIRST_SEQUENTIAL_ID:
+            order = self._find_sequential(order_id)
+            if order is not None:
+                return order
+        return self._scan_for(order_id)
+
+    def _find_sequential(self, order_id, slack=64):
+        # Sequential ids are appended in (nearly) increasing order after any
+        # migrated random ids, so a binary search lands within a few entries
+        # of the right one; tills racing to append can swap neighbours, which
+        # the slack window covers. Each till hands out ids from its own
+        # reserved block, so an id from a quiet till can sit further from
+        # its place; find() then falls back to a scan.
+        def key(position):
+            entry_id = self._read_entry(position)[0]
+            return entry_id if entry_id >= FIRST_SEQUENTIAL_ID else -1
+
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(mid) < order_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = max(lo - slack, 0)
+        entries = self._read_entries(start, min(lo + slack, len(self)))
+        for i, entry in enumerate(entries):
+            if entry[0] == order_id:
+                return self.read(start + i, start + i + 1)[0]
+        return None
+
+    def _scan_for(self, order_id):
+        count = len(self)
+        chunk = 4096
+        stop = count
+        while stop > 0:
+            start = max(stop - chunk, 0)
+            entries = self._read_entries(start, stop)
+            for i in range(len(entries) - 1, -1, -1):
+                if entries[i][0] == order_id:
+                    return self.read(start + i, start + i + 1)[0]
+            stop = start
+        return None
+
+    def between(self, start_time, end_time):
+        """Return the orders whose timestamp falls in [start_time, end_time)."""
+        lo = self._bisect_time(start_time)
+        hi = self._bisect_time(end_time)
+        return self.read(lo, hi)
+
+    def _bisect_time(self, moment):
+        if isinstance(moment, str):
+            moment = timestamp_to_epoch(moment)
+        elif isinstance(moment, datetime.datetime):
+            moment = moment.timestamp()
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._read_entry(mid)[1] < moment:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def migrate_from_text(self, text_file):
+        """One-time import of the old str(dict)-per-line orders file.
+
+        Returns the number of orders imported. The text file is renamed so the
+        import never runs twice.
+        """
+        import ast
+
+        if not os.path.exists(text_file):
+            return 0
+        with self.write_lock():
+            # Another till may have migrated it while we waited for the lock
+            if not os.path.exists(text_file):
+                return 0
+            imported = 0
+            with open(text_file, "r", encoding="utf-8") as f, \
+                    open(self.log_file, "ab") as log, \
+                    open(self.index_file, "ab") as index:
+                offset = log.seek(0, os.SEEK_END)
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        order = ast.literal_eval(line.strip())
+                        record = encode_order(order)
+                        entry = INDEX_ENTRY.pack(int(order["order_id"]),
+                                                 timestamp_to_epoch(order.get("timestamp")),
+                                                 offset, len(record) - RECORD_HEADER.size)
+                    except Exception:
+                        continue
+                    log.write(record)
+                    index.write(entry)
+                    offset += len(record)
+                    imported += 1
+                # The orders must be on disk before the text file is renamed
+                log.flush()
+                os.fsync(log.fileno())
+                index.flush()
+                os.fsync(index.fileno())
+            os.replace(text_file, text_file + ".migrated")
+            return imported
+
+
+DURABILITY_MODES = ("fsync", "group", "async")
+
+
+class _PendingOrder:
+    __slots__ = ("order", "done", "error")
+
+    def __init__(self, order):
+        self.order = order
+        self.done = threading.Event()
+        self.error = None
+
+
+class OrderWriter:
+    """Long-lived writer for an OrderStore with a choice of durability.
+
+    The log and index stay open between orders. ``mode`` is one of:
+
+    - "fsync": every append is written and fsynced before it returns.
+    - "group": every append that queues up while the previous batch is
+      being fsynced (plus any arriving within ``window`` seconds) is
+      written with one write and one fsync per file; each append returns
+      once its batch is on disk.
+    - "async": like "group", but append returns straight away. A crash can
+      lose the last unflushed batch.
+
+    Records are always fsynced before their index entries are written, so
+    the index never points at data that is not on disk.
+    """
+
+    def __init__(self, store, mode="group", window=0.0, max_batch=512):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"mode must be one of {DURABILITY_MODES}")
+        self.store = store
+        self.mode = mode
+        self.window = window
+        self.max_batch = max_batch
+        self._log = open(store.log_file, "ab")
+        self._index = open(store.index_file, "ab")
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self.last_error = None
+        self.commits = 0
+        self._thread = None
+        if mode != "fsync":
+            self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+            self._thread.start()
+
+    @property
+    def log_file(self):
+        return self.store.log_file
+
+    def __len__(self):
+        return len(self.store)
+
+    def last_order_id(self):
+        return self.store.last_order_id()
+
+    def append(self, order):
+        if self._closed:
+            raise ValueError("order writer is closed")
+        if self.mode == "fsync":
+            self._commit([order])
+            return
+        pending = _PendingOrder(order)
+        self._queue.put(pending)
+        if self.mode == "group":
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+
+    def flush(self):
+        """Wait until everything appended so far is on disk."""
+        if self.mode == "fsync":
+            return
+        marker = _PendingOrder(None)
+        self._queue.put(marker)
+        marker.done.wait()
+        if marker.error is not None:
+            raise marker.error
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self._log.close()
+        self._index.close()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            stop = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            orders = [item.order for item in batch if item.order is not None]
+            error = None
+            try:
+                if orders:
+                    self._commit(orders)
+            except Exception as e:
+                error = e
+            if error is not None and self.mode == "async":
+                # Nobody waits on an async append, so keep the failure for flush()
+                self.last_error = error
+            reported = error or self.last_error
+            for item in batch:
+                item.error = reported if item.order is None else error
+                item.done.set()
+            if any(item.order is None for item in batch):
+                # Each failure is raised by one flush(), not by every flush after it
+                self.last_error = None
+            if stop:
+                return
+
+    def _commit(self, orders):
+        with self._lock, self.store.write_lock():
+            # Another till may have appended since our last commit
+            offset = self._log.seek(0, os.SEEK_END)
+            records = bytearray()
+            entries = bytearray()
+            for order in orders:
+                record = encode_order(order)
+                entries += INDEX_ENTRY.pack(int(order["order_id"]),
+                                            timestamp_to_epoch(order.get("timestamp")),
+                                            offset + len(records), len(record) - RECORD_HEADER.size)
+                records += record
+            self._log.write(records)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._index.write(entries)
+            self._index.flush()
+            os.fsync(self._index.fileno())
+            self.commits += 1
@@ -0,0 +1,128 @@
+import collections
+
+Quote = collections.namedtuple("Quote", ["total", "summary"])
+# items is a tuple of (flavor, scoops, container, price), one per cart line
+CartQuote = collections.namedtuple("CartQuote", ["total", "summary", "items"])
+# Added to the scoops' price; callers that may change prices take a copy
+CONTAINER_PRICES = {"Cup": 0, "Cone": 10}
+
+
+def calculate_icecream_price(flavor, scoops, menu, container, container_prices):
+    if flavor not in menu:
+        return 0.0
+    if not (1 <= scoops <= 3):
+        return 0.0
+    total = menu[flavor] * scoops + container_prices.get(container, 0)
+    return total
+
+
+def build_summary(name, flavor, scoops, container, payment, delivery, total,
+                  address="", card_number=""):
+    # Only use ASCII in summary for PDF compatibility
+    summary = f"Order Summary for {name}:\n\n"
+    summary += f"- {scoops} scoop(s) of {flavor} in a {container}\n"
+    return summary + _summary_footer(payment, delivery, total, address, card_number)
+
+
+def build_cart_summary(name, items, payment, delivery, total, address="", card_number=""):
+    """Like build_summary, with one line per (flavor, scoops, container, price) item."""
+    summary = f"Order Summary for {name}:\n\n"
+    for flavor, scoops, container, price in items:
+        summary += f"- {scoops} scoop(s) of {flavor} in a {container} (Rs.{price:.2f})\n"
+    return summary + _summary_footer(payment, delivery, total, address, card_number)
+
+
+def _summary_footer(payment, delivery, total, address, card_number):
+    summary = f"- Payment: {payment}\n"
+    if payment == "Card":
+        if card_number:
+            summary += f"- Card Number: ****{card_number[-4:]}\n"
+        else:
+            summary += f"- Card Number: [Please enter card number]\n"
+    summary += f"- Delivery: {delivery}\n"
+    summary += f"- Total: Rs.{total:.2f}\n"
+
+    if delivery == "Delivery":
+        if address:
+            summary += f"- Delivery address: {address}\n"
+        else:
+            summary += "- Delivery address: [Please enter address]\n"
+    return summary
+
+
+class QuoteEngine:
+    """Prices orders and builds their summaries, remembering recent quotes.
+
+    Quotes are kept in a bounded LRU cache keyed on the order inputs and the
+    menu version. Call invalidate() whenever menu_items or container_prices
+    change so stale prices are never served.
+    """
+
+    def __init__(self, menu_items, container_prices, maxsize=256):
+        self.menu_items = menu_items
+        self.container_prices = container_prices
+        self.maxsize = maxsize
+        self.menu_version = 0
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self.menu_version += 1
+        self.cache.clear()
+
+    def _cached(self, key):
+        quote = self.cache.get(key)
+        if quote is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        return quote
+
+    def _remember(self, key, quote):
+        self.misses += 1
+        self.cache[key] = quote
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return quote
+
+    def quote(self, flavor, scoops, container, payment, delivery, address="",
+              card_number="", name="Customer"):
+        if payment != "Card":
+            card_number = ""
+        if delivery != "Delivery":
+            address = ""
+        # Only the last four card digits appear in the summary, so only they
+        # are part of the key (and kept in memory)
+        card_number = card_number[-4:]
+        key = (self.menu_version, name, flavor, scoops, container, payment,
+               delivery, address, card_number)
+        quote = self._cached(key)
+        if quote is not None:
+            return quote
+
+        total = calculate_icecream_price(flavor, scoops, self.menu_items,
+                                         container, self.container_prices)
+        return self._remember(key, Quote(total, build_summary(name, flavor, scoops, container, payment,
+                                                              delivery, total, address, card_number)))
+
+    def quote_cart(self, items, payment, delivery, address="", card_number="", name="Customer"):
+        """Price a cart of (flavor, scoops, container) items in one pass; returns a CartQuote."""
+        if payment != "Card":
+            card_number = ""
+        if delivery != "Delivery":
+            address = ""
+        card_number = card_number[-4:]
+        items = tuple(items)
+        key = (self.menu_version, name, items, payment, delivery, address, card_number)
+        quote = self._cached(key)
+        if quote is not None:
+            return quote
+
+        priced = tuple((flavor, scoops, container,
+                        calculate_icecream_price(flavor, scoops, self.menu_items,
+                                                 container, self.container_prices))
+                       for flavor, scoops, container in items)
+        total = sum(item[3] for item in priced)
+        return self._remember(key, CartQuote(total, build_cart_summary(name, priced, payment, delivery,
+                                                                       total, address, card_number),
+                                             priced))
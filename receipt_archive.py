@@ -0,0 +1,251 @@
+"""Receipts packed into compressed, append-only segment files.
+
+    python receipt_archive.py import . --delete       # pack old <id>_receipt.pdf files
+    python receipt_archive.py get 10042 receipt.pdf   # write one receipt back out
+
+Instead of one PDF file per order, each receipt is zlib-compressed and
+appended to the current segment file in the archive directory, and a new
+segment is started once one passes ``segment_size``. An index file with
+one fixed-size entry per receipt (order id, segment, offset, length) is
+read into a dict, so fetching a receipt is a dict lookup, one read and a
+decompress however many receipts there are.
+
+Receipts from one shop differ only in their order fields, so they are
+compressed against a preset dictionary: a sample receipt saved as
+dictionary.pdf when the archive is created and never changed after. With
+the page text left for zlib to compress, a receipt takes around 150 bytes
+instead of a 1.3KB file.
+
+A receipt can always be rebuilt from its order, since rendering stamps the
+order's own time rather than the clock; get() re-renders and archives any
+receipt that is missing or damaged. For the same reason nothing is
+fsynced: the order log is what has to survive a crash, and after a power
+loss an index entry can point at segment bytes that never reached disk.
+
+Several tills can share an archive. Appends hold a ``.lock`` file in the
+directory, and a crash between a segment write and its index entry only
+leaves bytes past the last indexed receipt, which the next append
+overwrites.
+"""
+import argparse
+import contextlib
+import os
+import re
+import struct
+import threading
+import zlib
+
+from file_lock import locked, open_lock_file
+from pricing import build_summary
+from receipts import ReceiptTemplate
+
+RECORD_HEADER = struct.Struct("<qI")  # order_id, length
+INDEX_ENTRY = struct.Struct("<qIQI")  # order_id, segment, offset, length
+SEGMENT_SIZE = 64 * 1024 * 1024
+RECEIPT_FILE = re.compile(r"^(\d+)_receipt\.pdf$")
+
+# Rendered once, when an archive is created, to seed its dictionary
+SAMPLE_ORDER = {"order_id": 10000, "customer_name": "Customer", "timestamp": "2024-01-01 12:00:00",
+                "total": 160.0, "summary": build_summary("Customer", "Vanilla", 1, "Cone", "Cash",
+                                                         "Takeaway", 160.0)}
+
+
+class ReceiptArchive:
+    def __init__(self, directory="receipts", segment_size=SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.index_file = os.path.join(directory, "index.idx")
+        self.dictionary_file = os.path.join(directory, "dictionary.pdf")
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file_lock = open_lock_file(os.path.join(directory, ".lock"))
+        self._render_lock = threading.Lock()
+        self._template = None
+        # The index is read by the first add() or read(), not at startup
+        self._entries = None
+        self._dictionary = None
+        self._index_size = 0
+        self._tail = (1, 0)
+
+    @contextlib.contextmanager
+    def write_lock(self):
+        with self._lock, locked(self._file_lock):
+            yield
+
+    def close(self):
+        self._file_lock.close()
+
+    def __len__(self):
+        self._load()
+        return len(self._entries)
+
+    def __contains__(self, order_id):
+        self._load()
+        return order_id in self._entries
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        dictionary = None
+        if not os.path.exists(self.dictionary_file):
+            dictionary = self.render(SAMPLE_ORDER)
+        with self.write_lock():
+            if self._entries is not None:
+                return
+            if not os.path.exists(self.dictionary_file):
+                tmp = f"{self.dictionary_file}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(dictionary)
+                os.replace(tmp, self.dictionary_file)
+            with open(self.dictionary_file, "rb") as f:
+                self._dictionary = f.read()
+            self._entries = {}
+            self._refresh()
+
+    def _refresh(self):
+        # Picks up entries appended since we last looked, by us or another
+        # till; a partly written entry at the end is left for next time
+        with open(self.index_file, "ab+") as f:
+            f.seek(self._index_size)
+            data = f.read()
+        data = data[:len(data) - len(data) % INDEX_ENTRY.size]
+        for order_id, segment, offset, length in INDEX_ENTRY.iter_unpack(data):
+            self._entries[order_id] = (segment, offset, length)
+            self._tail = (segment, offset + RECORD_HEADER.size + length)
+        self._index_size += len(data)
+
+    def segment_file(self, segment):
+        return os.path.join(self.directory, f"{segment:06d}.seg")
+
+    def render(self, order):
+        """Render an order's receipt to PDF bytes, without archiving it."""
+        with self._render_lock:
+            if self._template is None:
+                self._template = ReceiptTemplate()
+        return self._template.render_bytes(order, compress=False)
+
+    def add(self, order):
+        """Render an order's receipt into the archive; returns the order id."""
+        self.put(order["order_id"], self.render(order))
+        return order["order_id"]
+
+    def put(self, order_id, pdf):
+        """Archive the PDF bytes of one receipt, replacing any earlier one."""
+        self._load()
+        compressor = zlib.compressobj(9, zdict=self._dictionary)
+        data = compressor.compress(pdf) + compressor.flush()
+        with self.write_lock():
+            self._refresh()
+            index_size = os.path.getsize(self.index_file)
+            if index_size != self._index_size:
+                # A crash left part of an entry behind
+                with open(self.index_file, "r+b") as f:
+                    f.truncate(self._index_size)
+            segment, offset = self._tail
+            if offset >= self.segment_size:
+                segment, offset = segment + 1, 0
+            fd = os.open(self.segment_file(segment), os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, "r+b") as f:
+                f.truncate(offset)
+                f.seek(offset)
+                f.write(RECORD_HEADER.pack(order_id, len(data)) + data)
+            with open(self.index_file, "ab") as f:
+                f.write(INDEX_ENTRY.pack(order_id, segment, offset, len(data)))
+            self._index_size += INDEX_ENTRY.size
+            self._entries[order_id] = (segment, offset, len(data))
+            self._tail = (segment, offset + RECORD_HEADER.size + len(data))
+
+    def read(self, order_id):
+        """Return the archived PDF bytes for an order id, or None."""
+        self._load()
+        entry = self._entries.get(order_id)
+        if entry is None:
+            with self._lock:
+                self._refresh()
+            entry = self._entries.get(order_id)
+            if entry is None:
+                return None
+        segment, offset, length = entry
+        with open(self.segment_file(segment), "rb") as f:
+            f.seek(offset)
+            header = f.read(RECORD_HEADER.size)
+            data = f.read(length)
+        if (len(header) != RECORD_HEADER.size or len(data) != length
+                or RECORD_HEADER.unpack(header) != (order_id, length)):
+            raise ValueError(f"receipt archive entry for order {order_id} is damaged")
+        try:
+            decompressor = zlib.decompressobj(zdict=self._dictionary)
+            return decompressor.decompress(data) + decompressor.flush()
+        except zlib.error as e:
+            raise ValueError(f"receipt archive entry for order {order_id} is damaged: {e}") from e
+
+    def get(self, order):
+        """Return an order's receipt, rendering and archiving it if it is missing or damaged."""
+        try:
+            pdf = self.read(order["order_id"])
+        except ValueError:
+            # The new copy's index entry comes later, so it wins on reopen
+            pdf = None
+        if pdf is None:
+            pdf = self.render(order)
+            self.put(order["order_id"], pdf)
+        return pdf
+
+
+def import_receipt_files(archive, directory, delete=False):
+    """Archive every <order_id>_receipt.pdf in directory; returns how many."""
+    count = 0
+    for name in sorted(os.listdir(directory)):
+        match = RECEIPT_FILE.match(name)
+        if not match:
+            continue
+        path = os.path.join(directory, name)
+        order_id = int(match.group(1))
+        if order_id not in archive:
+            with open(path, "rb") as f:
+                archive.put(order_id, f.read())
+            count += 1
+        if delete:
+            os.remove(path)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive", default="receipts", help="archive directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("import", help="pack existing <order_id>_receipt.pdf files")
+    pack.add_argument("directory")
+    pack.add_argument("--delete", action="store_true", help="remove each file once it is archived")
+    fetch = commands.add_parser("get", help="write one receipt out as a PDF file")
+    fetch.add_argument("order_id", type=int)
+    fetch.add_argument("output")
+    fetch.add_argument("--orders-file", default="all_orders.log",
+                       help="order log to re-render from if the receipt is not archived")
+    args = parser.parse_args(argv)
+
+    archive = ReceiptArchive(args.archive)
+    if args.command == "import":
+        count = import_receipt_files(archive, args.directory, delete=args.delete)
+        print(f"Archived {count} receipts in {args.archive}")
+        return
+    try:
+        pdf = archive.read(args.order_id)
+    except ValueError:
+        pdf = None
+    if pdf is None:
+        from order_store import OrderStore
+
+        if not os.path.exists(args.orders_file):
+            raise SystemExit(f"Receipt {args.order_id} is not archived and {args.orders_file} does not exist")
+        order = OrderStore(args.orders_file).find(args.order_id)
+        if order is None:
+            raise SystemExit(f"No receipt or order with id {args.order_id}")
+        pdf = archive.get(order)
+    with open(args.output, "wb") as f:
+        f.write(pdf)
+    print(f"Wrote receipt for order {args.order_id} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
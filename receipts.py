@@ -0,0 +1,221 @@
+import queue
+import re
+import threading
+
+
+class _PDFBuffer:
+    """Stand-in for FPDF.buffer that collects chunks in a list.
+
+    pyfpdf grows its output buffer with str +=, which turns quadratic once a
+    document has hundreds of pages. It only ever appends to the buffer, takes
+    its len() and encodes it, so that is all this supports.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+
+    def __iadd__(self, s):
+        self.parts.append(s)
+        self.length += len(s)
+        return self
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return "".join(self.parts)
+
+    def encode(self, *args):
+        return str(self).encode(*args)
+
+
+def _new_document():
+    # fpdf pulls in urllib and email, which is most of the app's import time,
+    # so it is only imported once the first receipt is drawn
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.buffer = _PDFBuffer()
+    # Register the regular and bold fonts up front so they always get the
+    # same resource names (/F1, /F2) and a cached header stream stays valid
+    pdf.set_font("Arial", size=12)
+    pdf.set_font("Arial", style='B', size=12)
+    pdf.set_font("Arial", size=12)
+    return pdf
+
+
+def _draw_header(pdf):
+    # Restaurant Name
+    pdf.cell(200, 10, txt="Velvet Cone", ln=True, align='C')
+    pdf.ln(5)
+
+
+def _draw_body(pdf, order):
+    # Customer Name and Order ID
+    pdf.cell(200, 10, txt=f"Name: {order['customer_name']}", ln=True)
+    pdf.cell(200, 10, txt=f"Order ID: {order['order_id']}", ln=True)
+    pdf.cell(200, 10, txt=f"Time: {order['timestamp']}", ln=True)
+    pdf.ln(5)
+
+    # Order Summary
+    pdf.set_font("Arial", style='B', size=12)
+    pdf.cell(200, 10, "Order Summary:", ln=True)
+    pdf.set_font("Arial", size=12)
+
+    # Use only ASCII-safe summary
+    safe_summary = order['summary'].encode('ascii', 'replace').decode('ascii')
+    pdf.multi_cell(0, 10, safe_summary)
+    pdf.ln(5)
+
+    # Grand Total
+    pdf.set_font("Arial", style='B', size=12)
+    pdf.cell(200, 10, txt=f"Grand Total: Rs. {order['total']:.2f}", ln=True)
+    pdf.set_font("Arial", size=12)
+
+
+_CREATION_DATE = re.compile(rb"/CreationDate \(D:\d{14}\)")
+
+
+def _pdf_bytes(pdf, order):
+    # pyfpdf returns the document as a str (our buffer, here) of latin-1 text
+    data = str(pdf.output(dest="S")).encode("latin-1")
+    # fpdf stamps the time of rendering; stamp the order's own time instead
+    # so the same order always renders to the same bytes. It is the same
+    # length, so the xref offsets stay right.
+    stamp = re.sub(r"\D", "", str(order.get("timestamp", "")))
+    if len(stamp) == 14:
+        data = _CREATION_DATE.sub(b"/CreationDate (D:" + stamp.encode("ascii") + b")", data, count=1)
+    return data
+
+
+def receipt_filename(order):
+    return f"{order['order_id']}_receipt.pdf"
+
+
+def generate_pdf_receipt(order):
+    pdf = _new_document()
+    pdf.add_page()
+    _draw_header(pdf)
+    _draw_body(pdf, order)
+
+    filename = receipt_filename(order)
+    pdf.output(filename)
+    return filename
+
+
+class ReceiptTemplate:
+    """Receipt layout with the static header rendered only once.
+
+    The page content produced by the header is captured when the template is
+    built and copied onto every new page, so a receipt only lays out its own
+    order fields. A template holds no per-order state and can be shared
+    between worker threads.
+    """
+
+    def __init__(self):
+        pdf = _new_document()
+        pdf.add_page()
+        _draw_header(pdf)
+        self.header_stream = pdf.pages[pdf.page]
+        self.header_y = pdf.y
+
+    def _add_receipt_page(self, pdf, order):
+        pdf.add_page()
+        pdf.pages[pdf.page] = self.header_stream
+        pdf.x = pdf.l_margin
+        pdf.y = self.header_y
+        _draw_body(pdf, order)
+
+    def render(self, order, filename=None):
+        """Write one receipt to its own file and return the filename."""
+        pdf = _new_document()
+        self._add_receipt_page(pdf, order)
+        filename = filename or receipt_filename(order)
+        pdf.output(filename)
+        return filename
+
+    def render_bytes(self, order, compress=True):
+        """Return one receipt as PDF bytes, the same every time for an order.
+
+        ``compress=False`` leaves the page text uncompressed, for callers
+        that compress the whole document themselves.
+        """
+        pdf = _new_document()
+        pdf.set_compression(compress)
+        self._add_receipt_page(pdf, order)
+        return _pdf_bytes(pdf, order)
+
+    def render_many(self, orders):
+        """Write each order to its own receipt file; returns the filenames."""
+        return [self.render(order) for order in orders]
+
+    def render_batch(self, orders, filename):
+        """Write all orders into one PDF, one receipt per page."""
+        pdf = _new_document()
+        for order in orders:
+            self._add_receipt_page(pdf, order)
+        pdf.output(filename)
+        return filename
+
+
+class ReceiptWorkerPool:
+    """Renders receipts on background threads.
+
+    Jobs wait in a bounded queue; when it is full, submit() raises queue.Full
+    so the caller can hold off taking new orders. Each finished job is handed
+    to ``dispatch(callback, result, error)``, which is expected to run the
+    callback on the Tk thread; ``result`` is what the render function
+    returned (the filename, for the default one). ``wrap``, if given, is
+    applied to the render function once it exists (the metrics use it to
+    time each receipt).
+    """
+
+    def __init__(self, dispatch, render=None, workers=2, maxsize=16, wrap=None):
+        self.dispatch = dispatch
+        # The default template is built by the first job, not at startup
+        self.render = render if render is None or wrap is None else wrap(render)
+        self.wrap = wrap
+        self._render_lock = threading.Lock()
+        self.jobs = queue.Queue(maxsize=maxsize)
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"receipt-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def full(self):
+        return self.jobs.full()
+
+    def submit(self, order, callback):
+        self.jobs.put_nowait((order, callback))
+
+    def _renderer(self):
+        with self._render_lock:
+            if self.render is None:
+                self.render = ReceiptTemplate().render
+                if self.wrap is not None:
+                    self.render = self.wrap(self.render)
+            return self.render
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            order, callback = job
+            result, error = None, None
+            try:
+                result = self._renderer()(order)
+            except Exception as e:
+                error = e
+            self.jobs.task_done()
+            self.dispatch(callback, result, error)
+
+    def shutdown(self):
+        """Finish the queued receipts and stop the workers."""
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
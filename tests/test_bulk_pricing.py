@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+
+from bulk_pricing import price_batch, price_orders
+from order_service import OrderService
+from order_store import OrderStore
+from pricing import CONTAINER_PRICES, calculate_icecream_price
+
+MENU = {"Vanilla": 100.0, "Mango": 160.0, "Chocolate Fudge": 180.0}
+
+
+def test_price_orders_matches_the_stored_totals_of_carts(tmp_path):
+    service = OrderService(MENU, dict(CONTAINER_PRICES), OrderStore(str(tmp_path / "orders.log")))
+    customer = {"name": "Test", "phone": "0300", "payment": "Cash", "delivery": "Takeaway"}
+    requests = [
+        dict(customer, flavor="Vanilla", scoops=2, container="Cone"),
+        dict(customer, items=[{"flavor": "Mango", "scoops": 3, "container": "Cup"},
+                              {"flavor": "Vanilla", "scoops": 1, "container": "Cone"},
+                              {"flavor": "Chocolate Fudge", "scoops": 2, "container": "Cone"}]),
+        dict(customer, flavor="Chocolate Fudge", scoops=1, container="Cup"),
+        dict(customer, items=[{"flavor": "Vanilla", "scoops": 1, "container": "Cup"}]),
+    ]
+    orders = [service.place(request) for request in requests]
+    totals = price_orders(orders, MENU, CONTAINER_PRICES)
+    assert totals.tolist() == [order["total"] for order in orders]
+    assert totals[1] == 480.0 + 110.0 + 370.0
+
+
+def test_price_batch_matches_the_scalar_price_exactly():
+    rng = random.Random(7)
+    menu = {f"Flavour {i}": rng.randrange(100, 400) + rng.random() for i in range(40)}
+    flavors = [rng.choice(list(menu) + ["Unknown"]) for _ in range(5000)]
+    scoops = [rng.randint(0, 4) for _ in range(5000)]
+    containers = [rng.choice(["Cup", "Cone", "Waffle"]) for _ in range(5000)]
+    expected = [calculate_icecream_price(f, s, menu, c, CONTAINER_PRICES)
+                for f, s, c in zip(flavors, scoops, containers)]
+    totals = price_batch(np.array(flavors), np.array(scoops), np.array(containers), menu, CONTAINER_PRICES)
+    assert totals.tolist() == expected
+
+
+def test_unknown_flavors_and_scoops_out_of_range_cost_nothing():
+    totals = price_batch(["Vanilla", "Rocky Road", "Vanilla", "Vanilla", "Mango"], [2, 2, 0, 4, 3],
+                         ["Cone", "Cone", "Cone", "Cup", "Cup"], MENU, CONTAINER_PRICES)
+    assert totals.tolist() == [210.0, 0.0, 0.0, 0.0, 480.0]
+
+
+def test_empty_input_and_empty_menu():
+    assert price_batch([], [], [], MENU, CONTAINER_PRICES).tolist() == []
+    assert price_orders([], MENU, CONTAINER_PRICES).tolist() == []
+    assert price_batch(["Vanilla"], [1], ["Cup"], {}, CONTAINER_PRICES).tolist() == [0.0]
@@ -0,0 +1,61 @@
+import os
+
+from analytics import SalesAnalytics
+from customers import CustomerIndex
+from order_store import OrderStore
+
+
+def make_order(i):
+    return {"order_id": 10000 + i, "customer_name": f"Customer {i % 7}", "phone": f"03{i % 7:02d}",
+            "address": "", "flavor": "Vanilla", "scoops": 2, "container": "Cup", "payment": "Cash",
+            "delivery": "Takeaway", "total": 100.0, "timestamp": f"2024-01-0{1 + i % 3} 12:00:00"}
+
+
+def place(store, start, stop):
+    for i in range(start, stop):
+        store.append(make_order(i))
+
+
+def test_catch_up_never_writes_the_checkpoint(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.log"))
+    indexes = [SalesAnalytics(store, checkpoint_every=5).load(),
+               CustomerIndex(store, checkpoint_every=5).load()]
+    place(store, 0, 20)
+    for index in indexes:
+        assert index.catch_up() == 20
+        assert not os.path.exists(index.checkpoint_file)
+
+
+def test_load_checkpoints_a_long_catch_up(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.log"))
+    place(store, 0, 30)
+    analytics = SalesAnalytics(store, checkpoint_every=20).load()
+    customers = CustomerIndex(store, checkpoint_every=20).load()
+    assert os.path.exists(analytics.checkpoint_file)
+    assert os.path.exists(customers.checkpoint_file)
+
+    place(store, 30, 40)
+    analytics.catch_up()
+    customers.catch_up()
+    analytics.save()
+    customers.save()
+    place(store, 40, 45)
+
+    reopened = SalesAnalytics(store).load()
+    assert reopened.position == 45
+    assert reopened.report() == SalesAnalytics(store, checkpoint_file=str(tmp_path / "fresh")).load().report()
+    assert reopened.report()["orders"] == 45
+    reopened = CustomerIndex(store).load()
+    assert len(reopened) == 7
+    assert reopened.get("0303")["orders"] == sum(1 for i in range(45) if i % 7 == 3)
+    assert [c["phone"] for c in reopened.search_phone("030")] == [f"03{i:02d}" for i in range(7)]
+
+
+def test_bulk_catch_up_keeps_the_customer_lists_sorted(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.log"))
+    place(store, 0, 1500)
+    customers = CustomerIndex(store).load()
+    place(store, 1500, 1510)
+    customers.catch_up()
+    assert customers.search_name("customer 1")[0]["name"] == "Customer 1"
+    assert [c["phone"] for c in customers.search_phone("03")] == [f"03{i:02d}" for i in range(7)]
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+
+import pytest
+
+from menu_store import MenuStore, read_snapshot, snapshot_generation, write_snapshot
+
+
+def make_menu(path, menu):
+    store = MenuStore(str(path))
+    store.replace(menu)
+    return store
+
+
+def test_edits_are_journalled_and_replayed(tmp_path):
+    path = tmp_path / "menu.txt"
+    store = make_menu(path, {"Vanilla": 100.0, "Mango": 150.0})
+    store.add("Pistachio", 200.0)
+    store.reprice("Vanilla", 110.0)
+    store.rename("Mango", "Mango Sorbet")
+    assert read_snapshot(str(path)) == {"Vanilla": 100.0, "Mango": 150.0}
+    assert MenuStore(str(path)).load() == {"Vanilla": 110.0, "Pistachio": 200.0, "Mango Sorbet": 150.0}
+
+
+def test_compact_keeps_other_tills_edits(tmp_path):
+    path = tmp_path / "menu.txt"
+    make_menu(path, {"Vanilla": 100.0})
+    till_a = MenuStore(str(path))
+    till_a.load()
+    till_b = MenuStore(str(path))
+    till_b.load()
+
+    till_b.add("Mango", 150.0)
+    till_a.add("Pistachio", 200.0)
+    till_a.compact()
+
+    assert read_snapshot(str(path)) == {"Vanilla": 100.0, "Mango": 150.0, "Pistachio": 200.0}
+    assert MenuStore(str(path)).load() == {"Vanilla": 100.0, "Mango": 150.0, "Pistachio": 200.0}
+
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    path = tmp_path / "menu.txt"
+    store = make_menu(path, {"Vanilla": 100.0})
+    store.add("Mango", 150.0)
+    with open(store.journal_file, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "flav')
+    store = MenuStore(str(path))
+    assert store.load() == {"Vanilla": 100.0, "Mango": 150.0}
+    store.add("Pistachio", 200.0)
+    assert MenuStore(str(path)).load() == {"Vanilla": 100.0, "Mango": 150.0, "Pistachio": 200.0}
+
+
+def test_failed_journal_write_leaves_the_menu_alone(tmp_path):
+    path = tmp_path / "menu.txt"
+    store = make_menu(path, {"Vanilla": 100.0})
+    os.remove(store.journal_file)
+    os.mkdir(store.journal_file)
+    with pytest.raises(OSError):
+        store.add("Mango", 150.0)
+    assert store.menu == {"Vanilla": 100.0}
+
+
+def test_journal_left_by_a_crash_mid_compaction_is_skipped(tmp_path):
+    path = tmp_path / "menu.txt"
+    store = make_menu(path, {"Vanilla": 100.0})
+    store.add("Mango", 150.0)
+    store.rename("Mango", "Mango Sorbet")
+    store.add("Mango", 160.0)
+    expected = {"Vanilla": 100.0, "Mango Sorbet": 150.0, "Mango": 160.0}
+    # The new snapshot is written, then the till dies before the journal is replaced
+    write_snapshot(str(path), expected, snapshot_generation(str(path)) + 1)
+
+    store = MenuStore(str(path))
+    assert store.load() == expected
+    store.add("Pistachio", 200.0)
+    assert MenuStore(str(path)).load() == dict(expected, Pistachio=200.0)
+
+
+def test_journal_from_before_generations_is_replayed(tmp_path):
+    path = tmp_path / "menu.txt"
+    path.write_text("Vanilla - 100.0\n")
+    (tmp_path / "menu.txt.journal").write_text('{"op": "add", "flavor": "Mango", "price": 150.0}\n')
+    store = MenuStore(str(path))
+    assert store.load() == {"Vanilla": 100.0, "Mango": 150.0}
+    store.compact()
+    assert snapshot_generation(str(path)) == 1
+    assert read_snapshot(str(path)) == {"Vanilla": 100.0, "Mango": 150.0}
+    assert MenuStore(str(path)).load() == {"Vanilla": 100.0, "Mango": 150.0}
+
+
+def add_flavors(menu_file, till, count):
+    store = MenuStore(menu_file, compact_after=5)
+    store.load()
+    for i in range(count):
+        store.add(f"Till {till} flavor {i}", float(i))
+
+
+def test_tills_editing_one_menu_lose_nothing(tmp_path):
+    path = str(tmp_path / "menu.txt")
+    make_menu(path, {"Vanilla": 100.0})
+    tills = [multiprocessing.Process(target=add_flavors, args=(path, till, 30)) for till in range(4)]
+    for till in tills:
+        till.start()
+    for till in tills:
+        till.join()
+        assert till.exitcode == 0
+    menu = MenuStore(path).load()
+    assert len(menu) == 1 + 4 * 30
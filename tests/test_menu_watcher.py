@@ -0,0 +1,50 @@
+import pytest
+
+from menu_store import MenuStore, write_snapshot
+from menu_watcher import MenuWatcher
+
+
+@pytest.fixture
+def till(tmp_path):
+    store = MenuStore(str(tmp_path / "menu.txt"))
+    store.replace({"Vanilla": 100.0, "Mango": 160.0, "Pista": 150.0})
+    calls = []
+    watcher = MenuWatcher(store.menu_file, store.menu, store.signature,
+                          lambda callback, *args: calls.append(args), None)
+    return store, watcher, calls
+
+
+def test_reports_journalled_edits(till):
+    store, watcher, calls = till
+    other = MenuStore(store.menu_file)
+    other.load()
+    other.add("Chocolate Fudge", 180.0)
+    other.reprice("Mango", 175.5)
+    other.rename("Pista", "Pistachio")
+
+    watcher.check()
+    [(removed, updated, signature)] = calls
+    assert removed == ["Pista"]
+    assert updated == {"Mango": 175.5, "Chocolate Fudge": 180.0, "Pistachio": 150.0}
+    assert list(updated) == ["Mango", "Chocolate Fudge", "Pistachio"]
+    assert signature == other.signature
+
+    watcher.check()
+    assert len(calls) == 1
+
+
+def test_reports_a_hand_edited_menu_file(till):
+    store, watcher, calls = till
+    write_snapshot(store.menu_file, {"Vanilla": 110.0, "Mango": 160.0})
+
+    watcher.check()
+    assert calls == [(["Pista"], {"Vanilla": 110.0}, watcher.signature)]
+
+
+def test_compaction_alone_reports_nothing(till):
+    store, watcher, calls = till
+    store.compact()
+
+    watcher.check()
+    assert calls == []
+    assert watcher.signature == store.signature
@@ -0,0 +1,41 @@
+import math
+import random
+
+from metrics import BUCKETS_PER_DOUBLING, Histogram, Metrics
+
+# A sample is reported as the geometric middle of its bucket
+RELATIVE_ERROR = 2 ** (0.5 / BUCKETS_PER_DOUBLING)
+
+
+def test_quantiles_are_within_one_bucket_of_the_samples():
+    rng = random.Random(3)
+    # Order saves: mostly around 2 ms with a long tail
+    samples = [rng.lognormvariate(math.log(0.002), 0.8) for _ in range(20000)]
+    histogram = Histogram()
+    for seconds in samples:
+        histogram.record(seconds, now=100.0)
+
+    ordered = sorted(samples)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[math.ceil(q * len(ordered)) - 1]
+        assert 1 / RELATIVE_ERROR <= histogram.quantile(q) / exact <= RELATIVE_ERROR
+    summary = histogram.summary()
+    assert summary["count"] == len(samples)
+    assert summary["max"] == ordered[-1]
+    assert summary["p50"] == histogram.quantile(0.5)
+    assert histogram.per_minute(now=130.0) == len(samples)
+    assert histogram.per_minute(now=160.0) == 0
+
+
+def test_an_empty_histogram_reports_zeros():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.quantile(0.99) == 0.0
+    assert histogram.summary() == {"count": 0, "sum": 0.0, "max": 0.0, "per_minute": 0,
+                                   "p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+    metrics = Metrics()
+    metrics.histogram("save_order_to_file")
+    text = metrics.prometheus_text()
+    assert 'velvet_cone_latency_seconds_count{op="save_order_to_file"} 0' in text
+    assert "velvet_cone_orders_per_minute 0" in text
@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+
+from menu_store import MenuStore
+from order_api import create_api
+from order_store import OrderStore
+
+MENU = {"Vanilla": 100.0, "Mango": 160.0}
+CUSTOMER = {"name": "Test", "phone": "0300", "payment": "Cash", "delivery": "Takeaway"}
+
+
+@pytest.fixture
+def files(tmp_path):
+    menu_file = str(tmp_path / "menu.txt")
+    MenuStore(menu_file).replace(MENU)
+    return menu_file, str(tmp_path / "orders.log")
+
+
+def serve(files, client):
+    """Run client(reader, writer) against an API on a free port."""
+    async def main():
+        api = create_api(*files, receipts=False)
+        server = await api.start("127.0.0.1", 0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            try:
+                return await client(reader, writer)
+            finally:
+                writer.close()
+        finally:
+            api.close()
+
+    return asyncio.run(main())
+
+
+async def send(reader, writer, head, body=b""):
+    writer.write(head.encode("latin-1") + b"\r\n\r\n" + body)
+    lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:] if line)
+    payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+    return int(lines[0].split(" ")[1]), headers, payload
+
+
+def post(path, request):
+    body = json.dumps(request).encode("utf-8")
+    return f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}", body
+
+
+def test_menu_quote_and_orders(files):
+    async def client(reader, writer):
+        status, headers, payload = await send(reader, writer, "GET /menu HTTP/1.1")
+        assert status == 200 and headers["connection"] == "keep-alive"
+        assert payload["menu"] == MENU
+        assert payload["containers"]["Cone"] == 10
+
+        mango = dict(CUSTOMER, flavor="Mango", scoops=2, container="Cone")
+        status, _, quote = await send(reader, writer, *post("/quote", mango))
+        assert status == 200
+
+        status, _, single = await send(reader, writer, *post("/orders", mango))
+        assert status == 201
+        assert single["order"]["total"] == quote["total"]
+
+        cart = dict(CUSTOMER, items=[{"flavor": "Vanilla", "scoops": 1, "container": "Cup"},
+                                     {"flavor": "Mango", "scoops": 3, "container": "Cone"}])
+        status, _, placed = await send(reader, writer, *post("/orders", cart))
+        assert status == 201
+        return single["order"], placed["order"]
+
+    single, cart = serve(files, client)
+    assert [item["flavor"] for item in cart["items"]] == ["Vanilla", "Mango"]
+    assert cart["total"] == sum(item["price"] for item in cart["items"])
+    assert OrderStore(files[1]).read(0, 2) == [single, cart]
+
+
+def test_bad_requests_get_a_400_and_keep_the_connection(files):
+    async def client(reader, writer):
+        status, headers, payload = await send(reader, writer, "POST /quote HTTP/1.1\r\nContent-Length: 5",
+                                              b"{nope")
+        assert status == 400 and headers["connection"] == "keep-alive"
+        assert payload["errors"][0]["message"].startswith("Invalid JSON")
+
+        unknown = dict(CUSTOMER, flavor="Rocky Road")
+        status, headers, payload = await send(reader, writer, *post("/orders", unknown))
+        assert status == 400 and headers["connection"] == "keep-alive"
+        assert payload["errors"][0]["field"] == "flavor"
+
+        status, _, _ = await send(reader, writer, "GET /menu HTTP/1.1")
+        assert status == 200
+
+    serve(files, client)
+    assert len(OrderStore(files[1])) == 0
+
+
+@pytest.mark.parametrize("length, status", [("1000000", 413), ("-1", 400), ("12abc", 400)])
+def test_unreadable_body_closes_the_connection(files, length, status):
+    async def client(reader, writer):
+        response = await send(reader, writer, f"POST /orders HTTP/1.1\r\nContent-Length: {length}")
+        # The body was never read, so the server must not read on after it
+        assert await reader.read() == b""
+        return response
+
+    got, headers, payload = serve(files, client)
+    assert got == status
+    assert headers["connection"] == "close"
+    assert payload["errors"][0]["field"] is None
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from order_columns import OrderColumns, export_columns, read_log_orders
+from order_service import OrderService
+from order_store import OrderStore
+from pricing import CONTAINER_PRICES
+
+MENU = {"Vanilla": 100.0, "Mango": 160.0, "Chocolate Fudge": 180.0}
+
+
+@pytest.fixture
+def orders(tmp_path):
+    log_file = str(tmp_path / "orders.log")
+    service = OrderService(MENU, dict(CONTAINER_PRICES), OrderStore(log_file))
+    customer = {"name": "Test", "phone": "0300", "payment": "Cash", "delivery": "Takeaway"}
+    requests = [
+        dict(customer, flavor="Vanilla", scoops=2, container="Cone"),
+        dict(customer, items=[{"flavor": "Mango", "scoops": 3, "container": "Cup"},
+                              {"flavor": "Vanilla", "scoops": 1, "container": "Cone"}]),
+        dict(customer, flavor="Mango", scoops=1, container="Cup", payment="Card",
+             card_number="4111111111111111", delivery="Delivery", address="12 Mall Road"),
+        dict(customer, items=[{"flavor": "Chocolate Fudge", "scoops": 2, "container": "Cone"}],
+             delivery="Delivery", address="3 Canal Bank"),
+    ]
+    for request in requests:
+        service.place(request)
+    return list(read_log_orders(log_file))
+
+
+def test_export_round_trips_single_and_cart_orders(tmp_path, orders):
+    directory = str(tmp_path / "orders.columns")
+    assert export_columns(orders, directory, chunk=3) == len(orders)
+    columns = OrderColumns(directory)
+    assert len(columns) == len(orders)
+    assert columns.orders() == orders
+    assert list(columns.iter_orders(chunk=3)) == orders
+    assert columns.orders(1, 3) == orders[1:3]
+    assert columns["total"].tolist() == [order["total"] for order in orders]
+
+
+def test_reads_a_version_1_export(tmp_path, orders):
+    singles = [order for order in orders if "items" not in order]
+    directory = str(tmp_path / "orders.columns")
+    export_columns(singles, directory)
+    # A version 1 export is the same without the items column
+    meta_file = os.path.join(directory, "meta.json")
+    with open(meta_file, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["version"] = 1
+    meta["strings"].remove("items")
+    with open(meta_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.remove(os.path.join(directory, "items.bin"))
+    os.remove(os.path.join(directory, "items.offsets.bin"))
+
+    assert OrderColumns(directory).orders() == singles
+
+
+def test_failed_export_leaves_nothing_behind(tmp_path, orders):
+    directory = str(tmp_path / "orders.columns")
+
+    def failing():
+        yield from orders
+        raise OSError("source went away")
+
+    with pytest.raises(OSError):
+        export_columns(failing(), directory, chunk=2)
+    assert not os.path.exists(directory + ".tmp")
+    assert not os.path.exists(directory)
+
+
+def test_failed_export_keeps_the_previous_one(tmp_path, orders):
+    directory = str(tmp_path / "orders.columns")
+    export_columns(orders[:2], directory)
+
+    def failing():
+        yield orders[0]
+        raise OSError("source went away")
+
+    with pytest.raises(OSError):
+        export_columns(failing(), directory)
+    assert not os.path.exists(directory + ".tmp")
+    assert OrderColumns(directory).orders() == orders[:2]
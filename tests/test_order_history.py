@@ -0,0 +1,64 @@
+import pytest
+
+from order_history import OrderHistory
+from order_store import OrderStore
+
+
+def make_order(i):
+    return {"order_id": 10000 + i, "customer_name": f"Customer {i}", "flavor": "Vanilla", "scoops": 1,
+            "container": "Cup", "payment": "Cash", "delivery": "Takeaway", "total": 100.0,
+            "timestamp": "2024-01-01 12:00:00"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.log"))
+    for i in range(50):
+        store.append(make_order(i))
+    return store
+
+
+def test_behaves_like_the_list_of_orders(store):
+    history = OrderHistory(store, window=8, chunk=5)
+    expected = [make_order(i) for i in range(50)]
+    assert len(history) == 50
+    assert list(history) == expected
+    assert list(reversed(history)) == expected[::-1]
+    for i in (0, 41, 42, 49, -1, -8, -9, -50):
+        assert history[i] == expected[i]
+    with pytest.raises(IndexError):
+        history[50]
+    with pytest.raises(IndexError):
+        history[-51]
+
+
+def test_slices_cross_from_disk_into_the_window(store):
+    history = OrderHistory(store, window=8, chunk=5)
+    expected = [make_order(i) for i in range(50)]
+    for key in (slice(40, 45), slice(-10, None), slice(None, None), slice(30, 48, 3),
+                slice(None, None, -1), slice(45, 40), slice(-12, -2)):
+        assert history[key] == expected[key]
+
+
+def test_append_past_the_window(store):
+    history = OrderHistory(store, window=8, chunk=5)
+    for i in range(50, 70):
+        order = make_order(i)
+        store.append(order)
+        history.append(order)
+    expected = [make_order(i) for i in range(70)]
+    assert len(history) == 70
+    assert history[-1] == expected[-1]
+    assert history[55:65] == expected[55:65]
+    assert list(reversed(history)) == expected[::-1]
+    assert history.refresh() == 0
+
+
+def test_refresh_follows_other_tills(store):
+    history = OrderHistory(store, window=8)
+    other_till = OrderStore(store.log_file)
+    for i in range(50, 60):
+        other_till.append(make_order(i))
+    assert history.refresh() == 10
+    assert history[-10:] == [make_order(i) for i in range(50, 60)]
+    assert list(history) == [make_order(i) for i in range(60)]
@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+
+from order_ids import FIRST_SEQUENTIAL_ID, OrderIdAllocator
+from order_store import OrderStore
+
+
+def place(store, order_id):
+    store.append({"order_id": order_id, "customer_name": "Test", "flavor": "Vanilla", "scoops": 1,
+                  "container": "Cup", "payment": "Cash", "delivery": "Takeaway", "total": 100.0,
+                  "timestamp": "2024-01-01 12:00:00"})
+
+
+def test_ids_start_above_the_old_random_range(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.log"))
+    ids = OrderIdAllocator.for_store(store)
+    assert [ids.next_id() for _ in range(3)] == [FIRST_SEQUENTIAL_ID + i for i in range(3)]
+
+
+def test_lost_counter_does_not_reuse_logged_ids(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.log"))
+    ids = OrderIdAllocator.for_store(store)
+    for _ in range(3):
+        place(store, ids.next_id())
+    ids.close()
+    # A crash that loses the last counter writes leaves it behind the log
+    with open(ids.counter_file, "r+b") as f:
+        f.truncate(0)
+        f.write((FIRST_SEQUENTIAL_ID).to_bytes(8, "little"))
+
+    ids = OrderIdAllocator.for_store(OrderStore(store.log_file))
+    assert ids.next_id() == FIRST_SEQUENTIAL_ID + 3
+
+    os.remove(ids.counter_file)
+    ids = OrderIdAllocator.for_store(OrderStore(store.log_file))
+    assert ids.next_id() == FIRST_SEQUENTIAL_ID + 3
+
+
+def allocate(counter_file, count, results):
+    ids = OrderIdAllocator(counter_file)
+    results.put([ids.next_id() for _ in range(count)])
+
+
+def test_tills_never_share_an_id(tmp_path):
+    counter_file = str(tmp_path / "orders.seq")
+    results = multiprocessing.Queue()
+    tills = [multiprocessing.Process(target=allocate, args=(counter_file, 100, results)) for _ in range(4)]
+    for till in tills:
+        till.start()
+    allocated = [order_id for _ in tills for order_id in results.get(timeout=30)]
+    for till in tills:
+        till.join()
+    # Each till reserves whole blocks, so the ids are unique but not contiguous
+    assert len(set(allocated)) == 400
+    assert min(allocated) == FIRST_SEQUENTIAL_ID
+
+
+def test_allocators_sharing_a_counter_reserve_separate_blocks(tmp_path):
+    counter_file = str(tmp_path / "orders.seq")
+    first = OrderIdAllocator(counter_file, block=4)
+    second = OrderIdAllocator(counter_file, block=4)
+    allocated = []
+    for _ in range(10):
+        allocated += [first.next_id(), second.next_id(), second.next_id()]
+    assert len(set(allocated)) == len(allocated)
+    assert allocated[:3] == [FIRST_SEQUENTIAL_ID, FIRST_SEQUENTIAL_ID + 4, FIRST_SEQUENTIAL_ID + 5]
+
+
+def test_counter_is_written_once_per_block(tmp_path):
+    ids = OrderIdAllocator(str(tmp_path / "orders.seq"), block=8)
+    for expected in range(FIRST_SEQUENTIAL_ID, FIRST_SEQUENTIAL_ID + 8):
+        assert ids.next_id() == expected
+        with open(ids.counter_file, "rb") as f:
+            assert int.from_bytes(f.read(), "little") == FIRST_SEQUENTIAL_ID + 7
+    assert ids.next_id() == FIRST_SEQUENTIAL_ID + 8
@@ -0,0 +1,30 @@
+import pytest
+
+from order_service import OrderError, OrderService
+from order_store import OrderStore
+from pricing import CONTAINER_PRICES
+
+
+@pytest.fixture
+def service(tmp_path):
+    return OrderService({"Vanilla": 100.0}, dict(CONTAINER_PRICES), OrderStore(str(tmp_path / "orders.log")))
+
+
+def request(**fields):
+    return dict({"name": "Test", "phone": "0300", "flavor": "Vanilla", "scoops": 2,
+                 "container": "Cone", "payment": "Cash", "delivery": "Takeaway"}, **fields)
+
+
+@pytest.mark.parametrize("scoops", [2.7, 2.0, True, "2.5", "two", None, 0, 4, [2]])
+def test_scoops_must_be_a_whole_number_from_1_to_3(service, scoops):
+    errors = service.validate(request(scoops=scoops))
+    assert [e["field"] for e in errors] == ["scoops"]
+    with pytest.raises(OrderError):
+        service.place(request(items=[{"flavor": "Vanilla", "scoops": scoops}]))
+
+
+def test_scoops_from_csv_are_strings(service):
+    assert service.validate(request(scoops=" 3")) == []
+    order = service.place(request(scoops="3"))
+    assert order["scoops"] == 3
+    assert order["total"] == 310.0
@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+
+import pytest
+
+from order_store import INDEX_ENTRY, OrderStore, OrderWriter, encode_order
+
+
+def make_order(i):
+    return {"order_id": 10000 + i, "customer_name": f"Customer {i}", "phone": "0300",
+            "flavor": "Vanilla", "scoops": 1, "container": "Cup", "payment": "Cash",
+            "delivery": "Takeaway", "total": 100.0, "timestamp": f"2024-01-01 12:00:{i:02d}"}
+
+
+def write_orders(log_file, n):
+    store = OrderStore(log_file)
+    for i in range(n):
+        store.append(make_order(i))
+    store.close()
+    return store
+
+
+def ids(store):
+    return [order["order_id"] for order in store.read(0)]
+
+
+def test_append_and_read(tmp_path):
+    store = write_orders(str(tmp_path / "orders.log"), 5)
+    store = OrderStore(store.log_file)
+    assert len(store) == 5
+    assert ids(store) == [10000 + i for i in range(5)]
+    assert store.find(10003)["customer_name"] == "Customer 3"
+
+
+def test_missing_index_is_rebuilt_from_the_log(tmp_path):
+    store = write_orders(str(tmp_path / "orders.log"), 5)
+    log_size = os.path.getsize(store.log_file)
+    os.remove(store.index_file)
+
+    store = OrderStore(store.log_file)
+    assert os.path.getsize(store.log_file) == log_size
+    assert ids(store) == [10000 + i for i in range(5)]
+    assert store.between("2024-01-01 12:00:02", "2024-01-01 12:00:04") == \
+        [make_order(2), make_order(3)]
+
+
+def test_records_without_index_entries_are_kept(tmp_path):
+    # What a crash leaves when a batch's records were fsynced but its index
+    # entries were not written yet
+    store = write_orders(str(tmp_path / "orders.log"), 3)
+    with open(store.log_file, "ab") as log:
+        for i in range(3, 6):
+            log.write(encode_order(make_order(i)))
+
+    store = OrderStore(store.log_file)
+    assert ids(store) == [10000 + i for i in range(6)]
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    store = write_orders(str(tmp_path / "orders.log"), 3)
+    log_size = os.path.getsize(store.log_file)
+    with open(store.log_file, "ab") as log:
+        log.write(encode_order(make_order(3))[:-5])
+    with open(store.index_file, "ab") as index:
+        index.write(b"\0" * (INDEX_ENTRY.size // 2))
+
+    store = OrderStore(store.log_file)
+    assert ids(store) == [10000, 10001, 10002]
+    assert os.path.getsize(store.log_file) == log_size
+    assert os.path.getsize(store.index_file) == 3 * INDEX_ENTRY.size
+    store.append(make_order(3))
+    assert ids(OrderStore(store.log_file)) == [10000 + i for i in range(4)]
+
+
+def test_writer_modes_reach_the_log(tmp_path):
+    for mode in ("fsync", "group", "async"):
+        log_file = str(tmp_path / f"{mode}.log")
+        writer = OrderWriter(OrderStore(log_file), mode=mode)
+        for i in range(20):
+            writer.append(make_order(i))
+        writer.close()
+        assert ids(OrderStore(log_file)) == [10000 + i for i in range(20)]
+
+
+def test_migrate_from_text(tmp_path):
+    text_file = tmp_path / "all_orders.txt"
+    text_file.write_text("".join(str(make_order(i)) + "\n" for i in range(3)) + "not an order\n",
+                         encoding="utf-8")
+    store = OrderStore(str(tmp_path / "orders.log"))
+    assert store.migrate_from_text(str(text_file)) == 3
+    assert not text_file.exists()
+    assert (tmp_path / "all_orders.txt.migrated").exists()
+    assert ids(store) == [10000, 10001, 10002]
+    assert store.migrate_from_text(str(text_file)) == 0
+
+
+def test_async_write_error_is_raised_by_one_flush(tmp_path):
+    writer = OrderWriter(OrderStore(str(tmp_path / "orders.log")), mode="async")
+    commit = writer._commit
+
+    def fail(orders):
+        raise OSError("disk full")
+
+    writer._commit = fail
+    writer.append(make_order(0))
+    with pytest.raises(OSError):
+        writer.flush()
+    writer._commit = commit
+    writer.append(make_order(1))
+    writer.flush()
+    writer.close()
+    assert ids(OrderStore(writer.log_file)) == [10001]
+
+
+def place_orders(log_file, till, count, mode):
+    store = OrderStore(log_file)
+    writer = store if mode is None else OrderWriter(store, mode=mode)
+    for i in range(count):
+        writer.append(make_order(till * 1000 + i))
+    writer.close()
+
+
+def test_tills_appending_at_once(tmp_path):
+    log_file = str(tmp_path / "orders.log")
+    OrderStore(log_file).close()
+    modes = [None, "fsync", "group", "async"] * 2
+    tills = [multiprocessing.Process(target=place_orders, args=(log_file, till, 50, mode))
+             for till, mode in enumerate(modes)]
+    for till in tills:
+        till.start()
+    # Follow the log the way another till's history does while they write
+    reader = OrderStore(log_file)
+    seen = []
+    position = 0
+    while any(till.is_alive() for till in tills) or position < len(reader):
+        orders, position = reader.read_since(position)
+        seen += [order["order_id"] for order in orders]
+    for till in tills:
+        till.join()
+        assert till.exitcode == 0
+
+    expected = {10000 + till * 1000 + i for till in range(len(modes)) for i in range(50)}
+    assert ids(OrderStore(log_file)) == seen
+    assert sorted(seen) == sorted(expected)
+    for till in range(len(modes)):
+        mine = [order_id for order_id in seen if (order_id - 10000) // 1000 == till]
+        assert mine == sorted(mine)
@@ -0,0 +1,32 @@
+from pricing import CONTAINER_PRICES, QuoteEngine
+
+
+def test_invalidate_serves_the_new_price():
+    menu = {"Vanilla": 100.0}
+    engine = QuoteEngine(menu, dict(CONTAINER_PRICES))
+    assert engine.quote("Vanilla", 2, "Cone", "Cash", "Takeaway").total == 210.0
+    assert engine.quote("Vanilla", 2, "Cone", "Cash", "Takeaway").total == 210.0
+    assert engine.hits == 1
+
+    menu["Vanilla"] = 120.0
+    engine.invalidate()
+    quote = engine.quote("Vanilla", 2, "Cone", "Cash", "Takeaway")
+    assert quote.total == 250.0
+    assert "Rs.250.00" in quote.summary
+    cart = engine.quote_cart([("Vanilla", 1, "Cup"), ("Vanilla", 2, "Cone")], "Cash", "Takeaway")
+    assert cart.total == 370.0
+
+
+def test_cache_never_grows_past_maxsize():
+    menu = {f"Flavour {i}": 100.0 + i for i in range(50)}
+    engine = QuoteEngine(menu, dict(CONTAINER_PRICES), maxsize=16)
+    for flavor in menu:
+        for scoops in (1, 2, 3):
+            engine.quote(flavor, scoops, "Cup", "Cash", "Takeaway")
+            assert len(engine.cache) <= 16
+    assert len(engine.cache) == 16
+    # The most recently used quotes are the ones kept
+    engine.quote("Flavour 49", 3, "Cup", "Cash", "Takeaway")
+    assert engine.hits == 1
+    engine.quote("Flavour 0", 1, "Cup", "Cash", "Takeaway")
+    assert engine.hits == 1
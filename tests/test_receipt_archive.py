@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+
+import pytest
+
+from pricing import build_summary
+from receipt_archive import INDEX_ENTRY, ReceiptArchive, import_receipt_files
+
+
+def make_order(order_id):
+    return {"order_id": order_id, "customer_name": "Test", "timestamp": "2024-01-01 12:00:00",
+            "total": 210.0, "summary": build_summary("Test", "Vanilla", 2, "Cone", "Cash", "Takeaway", 210.0)}
+
+
+def test_receipts_round_trip_and_render_the_same_bytes(tmp_path):
+    archive = ReceiptArchive(str(tmp_path / "receipts"))
+    order = make_order(10000)
+    archive.add(order)
+    assert archive.read(10000) == archive.render(order)
+    assert archive.read(10001) is None
+    assert ReceiptArchive(archive.directory).read(10000) == archive.render(order)
+
+
+def test_new_segment_once_one_is_full(tmp_path):
+    archive = ReceiptArchive(str(tmp_path / "receipts"), segment_size=1000)
+    for order_id in range(10000, 10030):
+        archive.add(make_order(order_id))
+    assert os.path.exists(archive.segment_file(2))
+    reopened = ReceiptArchive(archive.directory, segment_size=1000)
+    assert len(reopened) == 30
+    assert all(reopened.read(order_id) == archive.render(make_order(order_id))
+               for order_id in range(10000, 10030))
+
+
+def test_torn_index_entry_is_overwritten(tmp_path):
+    archive = ReceiptArchive(str(tmp_path / "receipts"))
+    archive.add(make_order(10000))
+    with open(archive.index_file, "ab") as f:
+        f.write(b"\0" * (INDEX_ENTRY.size // 2))
+    with open(archive.segment_file(1), "ab") as f:
+        f.write(b"partly written receipt")
+
+    archive = ReceiptArchive(archive.directory)
+    assert len(archive) == 1
+    archive.add(make_order(10001))
+    assert os.path.getsize(archive.index_file) == 2 * INDEX_ENTRY.size
+    archive = ReceiptArchive(archive.directory)
+    assert archive.read(10000) == archive.render(make_order(10000))
+    assert archive.read(10001) == archive.render(make_order(10001))
+
+
+def test_get_archives_a_missing_receipt(tmp_path):
+    archive = ReceiptArchive(str(tmp_path / "receipts"))
+    order = make_order(10000)
+    assert archive.get(order) == archive.render(order)
+    assert 10000 in ReceiptArchive(archive.directory)
+
+
+def test_get_rebuilds_a_damaged_receipt(tmp_path):
+    archive = ReceiptArchive(str(tmp_path / "receipts"))
+    order = make_order(10000)
+    archive.add(order)
+    # What a power loss leaves when the index entry reached disk but the
+    # segment bytes did not
+    with open(archive.segment_file(1), "r+b") as f:
+        f.truncate(0)
+        f.write(b"\0" * 64)
+
+    archive = ReceiptArchive(archive.directory)
+    with pytest.raises(ValueError):
+        archive.read(10000)
+    assert archive.get(order) == archive.render(order)
+    assert ReceiptArchive(archive.directory).read(10000) == archive.render(order)
+
+
+def test_import_receipt_files(tmp_path):
+    archive = ReceiptArchive(str(tmp_path / "receipts"))
+    (tmp_path / "10000_receipt.pdf").write_bytes(b"%PDF-1.3 receipt")
+    (tmp_path / "notes.txt").write_text("not a receipt")
+    assert import_receipt_files(archive, str(tmp_path), delete=True) == 1
+    assert archive.read(10000) == b"%PDF-1.3 receipt"
+    assert not (tmp_path / "10000_receipt.pdf").exists()
+    assert (tmp_path / "notes.txt").exists()
+
+
+def archive_receipts(directory, first, count):
+    archive = ReceiptArchive(directory, segment_size=20000)
+    for order_id in range(first, first + count):
+        archive.add(make_order(order_id))
+    archive.close()
+
+
+def test_tills_sharing_an_archive(tmp_path):
+    directory = str(tmp_path / "receipts")
+    tills = [multiprocessing.Process(target=archive_receipts, args=(directory, 10000 + till * 100, 40))
+             for till in range(4)]
+    for till in tills:
+        till.start()
+    for till in tills:
+        till.join()
+        assert till.exitcode == 0
+
+    archive = ReceiptArchive(directory)
+    order_ids = [10000 + till * 100 + i for till in range(4) for i in range(40)]
+    assert len(archive) == len(order_ids)
+    assert all(archive.read(order_id) == archive.render(make_order(order_id)) for order_id in order_ids)
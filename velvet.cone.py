@@ -1,43 +1,70 @@
+import time
+_STARTED = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, filedialog, simpledialog
-import random
+from tkinter import ttk, messagebox, scrolledtext
+import argparse
 import datetime
-from fpdf import FPDF
-import shutil
-import os
-import ast
+import queue
+import threading
+from analytics import MIX_FIELDS, SalesAnalytics
+from customers import CustomerIndex
+from metrics import Metrics, MetricsDumper
+from order_store import OrderStore, OrderWriter
+from order_history import OrderHistory
+from receipt_archive import ReceiptArchive
+from receipts import ReceiptWorkerPool, receipt_filename
+from menu_view import MenuListView
+from pricing import CONTAINER_PRICES, QuoteEngine, calculate_icecream_price
+from menu_store import MenuStore
+from menu_watcher import MenuWatcher
+from order_service import OrderService
+
+class StartupProfile:
+    """Per-phase startup timings for --profile-startup."""
+
+    def __init__(self):
+        self.last = _STARTED
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        for phase, elapsed in self.phases:
+            print(f"{phase:<16} {elapsed * 1e3:8.1f} ms")
+        print(f"{'total':<16} {(self.last - _STARTED) * 1e3:8.1f} ms")
+
 
 class IceCreamShopApp:
     def load_menu_from_file(self, filename):
-        menu = {}
+        self.menu_store = MenuStore(filename)
         try:
-            with open(filename, "r") as f:
-                for line in f:
-                    if '-' in line:
-                        parts = line.strip().split('-', 1)
-                        if len(parts) == 2:
-                            flavor = parts[0].strip()
-                            price_str = parts[1].strip()
-                            try:
-                                menu[flavor] = float(price_str)
-                            except ValueError:
-                                pass
+            self.menu_store.load()
         except FileNotFoundError:
             messagebox.showerror("Error", f"Menu file '{filename}' not found.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load menu: {e}")
-        return menu if menu else {"Vanilla": 100.0}
+        if not self.menu_store.menu:
+            self.menu_store.menu["Vanilla"] = 100.0
+        return self.menu_store.menu
 
-    def save_menu_to_file(self, filename, menu_dict):
-        try:
-            with open(filename, "w") as f:
-                for flavor, price in menu_dict.items():
-                    f.write(f"{flavor} - {price}\n")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save menu: {e}")
-
-    def __init__(self, root):
+    def __init__(self, root, profile=None, metrics_file=None, metrics_interval=15.0):
         self.root = root
+        self.profile = profile
+        # Hot-path timings are only recorded when started with --metrics;
+        # otherwise nothing is wrapped and the methods run as they are
+        self.metrics = None
+        self.metrics_dumper = None
+        if metrics_file:
+            self.metrics = Metrics()
+            self.metrics.instrument(self, "place_order", "save_order_to_file", "update_summary",
+                                    "refresh_summary", "create_menu_canvas", "load_all_orders",
+                                    "generate_pdf_receipt")
+            self.metrics_dumper = MetricsDumper(self.metrics, metrics_file, metrics_interval)
+            self.metrics_dumper.start()
         self.root.title("Velvet Cone - Ice Cream Ordering System")
         self.root.geometry("1000x600")
         self.root.configure(bg="#E3F2FD")
@@ -48,19 +75,128 @@ class IceCreamShopApp:
 
         self.menu_txt_file = "menu.txt"
         self.menu_items = self.load_menu_from_file(self.menu_txt_file)
-        self.container_prices = {"Cup": 0, "Cone": 10}
-        self.orders_file = "all_orders.txt"
-        self.load_all_orders()
+        self.container_prices = dict(CONTAINER_PRICES)
+        self.quote_engine = QuoteEngine(self.menu_items, self.container_prices)
+        self.orders_file = "all_orders.log"
+        self.legacy_orders_file = "all_orders.txt"
+        # Filled in by the startup steps once the window is up
+        self.order_writer = None
+        self.analytics = None
+        self.customers = None
+        self.reports_window = None
+        self.diagnostics_window = None
+        self.menu_watcher = None
+        self.mark("menu")
+
+        # Work finished on background threads is handed back to the Tk thread here
+        self.ui_queue = queue.Queue()
+        timed_receipts = None
+        if self.metrics is not None:
+            timed_receipts = lambda render: self.metrics.timed("generate_pdf_receipt", render)
+        # Receipts go into one compressed archive, not a PDF file per order
+        self.receipt_archive = ReceiptArchive("receipts")
+        self.receipt_pool = ReceiptWorkerPool(self.call_in_ui, render=self.receipt_archive.add,
+                                              wrap=timed_receipts)
+        self.root.after(50, self.drain_ui_queue)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Not on any menu: the diagnostics window is for whoever is looking
+        # into a slow till
+        self.root.bind("<Control-Shift-D>", self.show_diagnostics)
 
         self.create_widgets()
+        self.mark("order form")
+        # The rest is done one step at a time once the window is mapped, so
+        # the form is painted before the menu panel and the order log are
+        # loaded, and Tk gets to redraw between steps
+        self.startup_steps = [self.show_menu_panel, self.open_order_log, self.start_background_work]
+        self.startup_started = False
+        self.root.bind("<Map>", self.window_mapped, add="+")
+
+    def mark(self, phase):
+        if self.profile is not None:
+            self.profile.mark(phase)
+
+    def window_mapped(self, event):
+        # Every widget's <Map> also reaches the root's bindings
+        if event.widget is not self.root or self.startup_started:
+            return
+        self.startup_started = True
+        # A timer, not an idle callback: Tk handles the pending Expose
+        # events before timers, and the step then draws what they asked for
+        self.root.after(1, self.next_startup_step)
+
+    def next_startup_step(self):
+        self.root.update_idletasks()
+        step = self.startup_steps.pop(0)
+        step()
+        if self.startup_steps:
+            self.root.after(1, self.next_startup_step)
+
+    def show_menu_panel(self):
+        self.mark("window shown")
+        self.create_menu_canvas()
+        self.mark("menu panel")
+
+    def open_order_log(self):
+        self.load_all_orders()
+        self.order_service = OrderService(self.menu_items, self.container_prices,
+                                          self.order_writer, self.quote_engine)
+        self.update_history()
+        self.order_btn.config(state=tk.NORMAL)
+        self.mark("order history")
+
+    def start_background_work(self):
+        # The sales totals and the customer index are read off the Tk thread:
+        # with no checkpoint yet, e.g. on the first start after an upgrade,
+        # they are rebuilt from the whole log and checkpointed. Reports and
+        # autocomplete start working once they arrive; after that they are
+        # only checkpointed again on close.
+        threading.Thread(target=self.load_analytics, name="sales-totals", daemon=True).start()
+        threading.Thread(target=self.load_customers, name="customer-index", daemon=True).start()
+
+        # Pick up menu edits made on other tills
+        self.menu_watcher = MenuWatcher(self.menu_txt_file, self.menu_items, self.menu_store.signature,
+                                        self.call_in_ui, self.apply_menu_changes)
+        self.menu_watcher.start()
+        # Pick up orders placed on other tills sharing the order log
+        self.root.after(1000, self.poll_orders)
+
+        if self.profile is not None:
+            self.profile.report()
+            self.on_close()
+
+    def call_in_ui(self, callback, *args):
+        # Safe to call from any thread
+        self.ui_queue.put((callback, args))
+
+    def drain_ui_queue(self):
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        self.root.after(50, self.drain_ui_queue)
+
+    def on_close(self):
+        if self.menu_watcher is not None:
+            self.menu_watcher.stop()
+        self.receipt_pool.shutdown()
+        self.receipt_archive.close()
+        if self.order_writer is not None:
+            self.order_writer.close()
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.stop()
+        for index in (self.analytics, self.customers):
+            if index is not None:
+                try:
+                    index.save()
+                except OSError:
+                    pass
+        self.root.destroy()
 
     def calculate_icecream_price(self, flavor, scoops, menu, container, container_prices):
-        if flavor not in menu:
-            return 0.0
-        if not (1 <= scoops <= 3):
-            return 0.0
-        total = menu[flavor] * scoops + container_prices.get(container, 0)
-        return total
+        return calculate_icecream_price(flavor, scoops, menu, container, container_prices)
 
     def create_logo(self):
         logo_frame = tk.Frame(self.root, bg="#E3F2FD")
@@ -99,6 +235,18 @@ class IceCreamShopApp:
         self.phone_entry = tk.Entry(info_frame)
         self.phone_entry.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
 
+        # Repeat-customer suggestions, shown under whichever entry is being typed in
+        self.suggestion_box = tk.Listbox(self.root, height=6, bg="white", fg="#4B4453")
+        self.suggestions = []
+        for entry, field in ((self.name_entry, "name"), (self.phone_entry, "phone")):
+            entry.bind("<KeyRelease>", lambda event, entry=entry, field=field:
+                       self.suggest_customers(event, entry, field))
+            entry.bind("<FocusOut>", lambda event: self.root.after(200, self.hide_suggestions))
+        self.suggestion_box.bind("<Return>", self.pick_suggestion)
+        self.suggestion_box.bind("<ButtonRelease-1>", self.pick_suggestion)
+        self.suggestion_box.bind("<Escape>", lambda event: self.hide_suggestions(force=True))
+        self.suggestion_box.bind("<FocusOut>", lambda event: self.root.after(200, self.hide_suggestions))
+
         # Order details
         order_details_frame = tk.LabelFrame(order_frame, text="Order Details", bg="#E3F2FD",
                                             fg="#2B2E4A", font=("Arial", 10, "bold"))
@@ -152,6 +300,20 @@ class IceCreamShopApp:
         self.address_label = tk.Label(order_details_frame, text="Address:", bg="#E3F2FD")
         self.address_text = scrolledtext.ScrolledText(order_details_frame, height=3, width=30)
 
+        # Cart: several items placed, stored and printed as one order
+        cart_frame = tk.LabelFrame(order_frame, text="Cart", bg="#E3F2FD",
+                                   fg="#2B2E4A", font=("Arial", 10, "bold"))
+        cart_frame.pack(fill=tk.X, pady=5)
+        self.cart = []
+        self.cart_list = tk.Listbox(cart_frame, height=3, bg="white", fg="#4B4453")
+        self.cart_list.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
+        cart_buttons = tk.Frame(cart_frame, bg="#E3F2FD")
+        cart_buttons.pack(side=tk.RIGHT, padx=5)
+        tk.Button(cart_buttons, text="Add to Cart", command=self.add_to_cart,
+                  bg="#3F72AF", fg="white", font=("Arial", 9, "bold")).pack(fill=tk.X, pady=1)
+        tk.Button(cart_buttons, text="Remove", command=self.remove_from_cart,
+                  font=("Arial", 9)).pack(fill=tk.X, pady=1)
+
         # Order summary (Total will be shown here!)
         summary_frame = tk.LabelFrame(order_frame, text="Order Summary", bg="#E3F2FD",
                                       fg="#2B2E4A", font=("Arial", 10, "bold"))
@@ -159,11 +321,17 @@ class IceCreamShopApp:
 
         self.summary_text = tk.Text(summary_frame, height=8, bg="white", fg="#4B4453")
         self.summary_text.pack(fill=tk.BOTH, expand=True)
+        self.summary_pending = None
+        self.summary_rendered = None
+        # How many times the summary was asked for, recomputed and redrawn
+        self.summary_stats = {"requested": 0, "computed": 0, "rendered": 0}
 
         # Place order button
-        order_btn = tk.Button(order_frame, text="Place Order", command=self.place_order,
-                              bg="#3F72AF", fg="white", font=("Arial", 12, "bold"))
-        order_btn.pack(pady=10, ipadx=20)
+        # Enabled by open_order_log once the order log is open
+        self.order_btn = tk.Button(order_frame, text="Place Order", command=self.place_order,
+                                   bg="#3F72AF", fg="white", font=("Arial", 12, "bold"),
+                                   state=tk.DISABLED)
+        self.order_btn.pack(pady=10, ipadx=20)
 
         # Menu display
         tk.Label(menu_frame, text="Our Delicious Flavors", font=("Arial", 16, "bold"),
@@ -181,10 +349,12 @@ class IceCreamShopApp:
         update_flavor_btn = tk.Button(btn_flavor_frame, text="Update Flavor", command=self.update_flavor_popup,
                                       bg="#3F72AF", fg="white", font=("Arial", 10, "bold"))
         update_flavor_btn.pack(side=tk.LEFT, padx=4)
+        reports_btn = tk.Button(btn_flavor_frame, text="Reports", command=self.show_reports,
+                                bg="#3F72AF", fg="white", font=("Arial", 10, "bold"))
+        reports_btn.pack(side=tk.LEFT, padx=4)
 
-        # Create a canvas and scrollbar for the menu
+        # The menu canvas itself is created by show_menu_panel
         self.menu_display = menu_display
-        self.create_menu_canvas()
 
         # Order history section
         history_frame = tk.LabelFrame(menu_frame, text="Order History", bg="#E3F2FD",
@@ -208,42 +378,39 @@ class IceCreamShopApp:
         self.toggle_card_entry()
 
     def create_menu_canvas(self):
-        # Destroy previous menu canvas if exists
-        if hasattr(self, 'canvas'):
-            self.canvas.destroy()
-        if hasattr(self, 'scrollbar'):
-            self.scrollbar.destroy()
-        if hasattr(self, 'scrollable_frame'):
-            self.scrollable_frame.destroy()
-
-        self.canvas = tk.Canvas(self.menu_display, bg="#E3F2FD", highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(self.menu_display, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg="#E3F2FD")
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(
-                scrollregion=self.canvas.bbox("all")
-            )
-        )
-
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
-
-        # Display menu items with "fancy" styling
-        for i, (flavor, price) in enumerate(self.menu_items.items()):
-            item_frame = tk.Frame(self.scrollable_frame, bg="#E3F2FD", bd=1, relief=tk.RIDGE)
-            item_frame.pack(fill=tk.X, pady=2, padx=5)
-            if i % 2 == 0:
-                item_frame.configure(bg="#E3F2FD")
-
-            tk.Label(item_frame, text=flavor, font=("Arial", 11),
-                     bg=item_frame["bg"], fg="#4B4453").pack(side=tk.LEFT, padx=10)
-            tk.Label(item_frame, text=f"Rs.{price:.2f}", font=("Arial", 11, "bold"),
-                     bg=item_frame["bg"], fg="#2B2E4A").pack(side=tk.RIGHT, padx=10)
+        # Destroy previous menu view if exists
+        if hasattr(self, 'menu_view'):
+            self.menu_view.destroy()
+
+        # Only the rows in view are drawn, so this is cheap for large menus
+        self.menu_view = MenuListView(self.menu_display, self.menu_items)
+
+    def add_menu_row(self, flavor, price):
+        self.menu_view.add(flavor)
+
+    def update_menu_row(self, old_flavor, new_flavor, price):
+        self.menu_view.update(old_flavor, new_flavor)
+
+    def apply_menu_changes(self, removed, updated, signature):
+        # Runs on the Tk thread with only the entries that changed on disk
+        removed = [flavor for flavor in removed if flavor in self.menu_items]
+        updated = {flavor: price for flavor, price in updated.items()
+                   if self.menu_items.get(flavor) != price}
+        self.menu_store.signature = signature
+        if not removed and not updated:
+            return
+        if not updated and len(removed) == len(self.menu_items):
+            # Never leave the till with an empty menu
+            return
+        for flavor in removed:
+            del self.menu_items[flavor]
+        self.menu_items.update(updated)
+        self.quote_engine.invalidate()
+        self.flavor_menu["values"] = list(self.menu_items.keys())
+        if self.flavor_var.get() not in self.menu_items:
+            self.flavor_var.set(list(self.menu_items.keys())[0])
+        self.menu_view.sync(removed, updated)
+        self.update_summary()
 
     def add_flavor_popup(self):
         # Popup window for adding a new flavor and price
@@ -279,10 +446,14 @@ class IceCreamShopApp:
             if flavor in self.menu_items:
                 messagebox.showerror("Error", "This flavor already exists.")
                 return
-            self.menu_items[flavor] = price
-            self.save_menu_to_file(self.menu_txt_file, self.menu_items)
+            try:
+                self.menu_store.add(flavor, price)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save menu: {e}")
+                return
+            self.quote_engine.invalidate()
             self.flavor_menu["values"] = list(self.menu_items.keys())
-            self.create_menu_canvas()
+            self.add_menu_row(flavor, price)
             messagebox.showinfo("Success", f"Added {flavor} for Rs.{price:.2f}!")
             popup.destroy()
 
@@ -336,14 +507,26 @@ class IceCreamShopApp:
             if new_name != old_flavor and new_name in self.menu_items:
                 messagebox.showerror("Error", "This new flavor name already exists.")
                 return
-            # Update menu dict
-            if new_name != old_flavor:
-                self.menu_items[new_name] = self.menu_items.pop(old_flavor)
-            self.menu_items[new_name] = new_price
-            self.save_menu_to_file(self.menu_txt_file, self.menu_items)
+            # Update menu dict (the store journals each change)
+            saved = True
+            try:
+                if new_name != old_flavor:
+                    self.menu_store.rename(old_flavor, new_name)
+                if new_price != self.menu_items[new_name]:
+                    self.menu_store.reprice(new_name, new_price)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save menu: {e}")
+                if old_flavor in self.menu_items:
+                    return
+                # The rename was saved but the new price was not
+                new_price = self.menu_items[new_name]
+                saved = False
+            self.quote_engine.invalidate()
             self.flavor_menu["values"] = list(self.menu_items.keys())
             self.flavor_var.set(list(self.menu_items.keys())[0])
-            self.create_menu_canvas()
+            self.update_menu_row(old_flavor, new_name, new_price)
+            if not saved:
+                return
             messagebox.showinfo("Success", f"Flavor updated: {old_flavor} -> {new_name}, Price: Rs.{new_price:.2f}")
             popup.destroy()
 
@@ -359,15 +542,38 @@ class IceCreamShopApp:
             self.card_entry.grid_remove()
         self.update_summary()
 
+    def add_to_cart(self):
+        item = (self.flavor_var.get(), self.scoops_var.get(), self.container_var.get())
+        self.cart.append(item)
+        self.cart_list.insert(tk.END, f"{item[1]} scoop(s) of {item[0]} in a {item[2]}")
+        self.update_summary()
+
+    def remove_from_cart(self):
+        selection = self.cart_list.curselection()
+        if not selection:
+            return
+        del self.cart[selection[0]]
+        self.cart_list.delete(selection[0])
+        self.update_summary()
+
+    def current_quote(self, name):
+        # With items in the cart, the cart is what gets ordered and summarised
+        if self.cart:
+            return self.quote_engine.quote_cart(
+                self.cart, self.payment_var.get(), self.delivery_var.get(),
+                address=self.address_text.get(1.0, tk.END).strip(),
+                card_number=self.card_entry.get(), name=name
+            )
+        return self.quote_engine.quote(
+            self.flavor_var.get(), self.scoops_var.get(), self.container_var.get(),
+            self.payment_var.get(), self.delivery_var.get(),
+            address=self.address_text.get(1.0, tk.END).strip(),
+            card_number=self.card_entry.get(), name=name
+        )
+
     def update_total(self):
-        flavor = self.flavor_var.get()
-        scoops = self.scoops_var.get()
-        container = self.container_var.get()
         try:
-            total = self.calculate_icecream_price(
-                flavor, scoops, self.menu_items, container, self.container_prices
-            )
-            return total
+            return self.current_quote(self.name_entry.get() or "Customer").total
         except Exception:
             return 0.0
 
@@ -381,182 +587,178 @@ class IceCreamShopApp:
         self.update_summary()
 
     def update_summary(self):
-        self.summary_text.config(state=tk.NORMAL)
-        self.summary_text.delete(1.0, tk.END)
+        # Coalesce bursts of changes (e.g. the form reset after an order)
+        # into one recompute when Tk is next idle
+        self.summary_stats["requested"] += 1
+        if self.summary_pending is None:
+            self.summary_pending = self.root.after_idle(self.refresh_summary)
 
-        name = self.name_entry.get() or "Customer"
-        flavor = self.flavor_var.get()
-        scoops = self.scoops_var.get()
-        container = self.container_var.get()
-        payment = self.payment_var.get()
-        delivery = self.delivery_var.get()
-        total = self.update_total()
-
-        # Only use ASCII in summary for PDF compatibility
-        summary = f"Order Summary for {name}:\n\n"
-        summary += f"- {scoops} scoop(s) of {flavor} in a {container}\n"
-        summary += f"- Payment: {payment}\n"
-        if payment == "Card":
-            card_number = self.card_entry.get()
-            if card_number:
-                summary += f"- Card Number: ****{card_number[-4:]}\n"
-            else:
-                summary += f"- Card Number: [Please enter card number]\n"
-        summary += f"- Delivery: {delivery}\n"
-        summary += f"- Total: Rs.{total:.2f}\n"
-
-        if delivery == "Delivery":
-            address = self.address_text.get(1.0, tk.END).strip()
-            if address:
-                summary += f"- Delivery address: {address}\n"
-            else:
-                summary += "- Delivery address: [Please enter address]\n"
+    def refresh_summary(self):
+        self.summary_pending = None
+        self.summary_stats["computed"] += 1
+
+        summary = self.current_quote(self.name_entry.get() or "Customer").summary
 
+        if summary == self.summary_rendered:
+            return
+        self.summary_rendered = summary
+        self.summary_stats["rendered"] += 1
+        self.summary_text.config(state=tk.NORMAL)
+        self.summary_text.delete(1.0, tk.END)
         self.summary_text.insert(tk.END, summary)
         self.summary_text.config(state=tk.DISABLED)
 
     def generate_pdf_receipt(self, order):
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-
-        # Restaurant Name
-        pdf.cell(200, 10, txt="Velvet Cone", ln=True, align='C')
-        pdf.ln(5)
-
-        # Customer Name and Order ID
-        pdf.cell(200, 10, txt=f"Name: {order['customer_name']}", ln=True)
-        pdf.cell(200, 10, txt=f"Order ID: {order['order_id']}", ln=True)
-        pdf.cell(200, 10, txt=f"Time: {order['timestamp']}", ln=True)
-        pdf.ln(5)
-
-        # Order Summary
-        pdf.set_font("Arial", style='B', size=12)
-        pdf.cell(200, 10, "Order Summary:", ln=True)
-        pdf.set_font("Arial", size=12)
-
-        # Use only ASCII-safe summary
-        safe_summary = order['summary'].encode('ascii', 'replace').decode('ascii')
-        pdf.multi_cell(0, 10, safe_summary)
-        pdf.ln(5)
-
-        # Grand Total
-        pdf.set_font("Arial", style='B', size=12)
-        pdf.cell(200, 10, txt=f"Grand Total: Rs. {order['total']:.2f}", ln=True)
-
-        filename = f"{order['order_id']}_receipt.pdf"
-        pdf.output(filename)
-        return filename
+        """Render the order's receipt into the receipt archive."""
+        return self.receipt_archive.add(order)
 
     def load_all_orders(self):
-        """Load all orders from text file into self.order_history."""
-        self.order_history = []
-        if os.path.exists(self.orders_file):
-            with open(self.orders_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            order_dict = ast.literal_eval(line.strip())
-                            self.order_history.append(order_dict)
-                        except Exception:
-                            continue
-
-    def save_order_to_file(self, order):
-        """Append the new order to the text file."""
+        """Open the order log and expose it through self.order_history."""
+        self.order_store = OrderStore(self.orders_file)
         try:
-            with open(self.orders_file, "a", encoding="utf-8") as f:
-                f.write(str(order) + "\n")
+            self.order_store.migrate_from_text(self.legacy_orders_file)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save order to file: {e}")
+            messagebox.showerror("Error", f"Failed to migrate old orders: {e}")
+        self.order_history = OrderHistory(self.order_store)
+        self.order_writer = OrderWriter(self.order_store, mode="group")
 
-    def place_order(self):
-        if not self.name_entry.get():
-            messagebox.showerror("Error", "Please enter your name")
+    def refresh_orders(self):
+        """Show any orders added to the log since we last looked, ours or another till's."""
+        try:
+            new = self.order_history.refresh()
+        except (OSError, ValueError):
+            return
+        if new:
+            self.update_history()
+            if self.analytics is not None:
+                self.analytics.catch_up()
+            if self.customers is not None:
+                self.customers.catch_up()
+            if self.reports_window is not None and self.reports_window.winfo_exists():
+                self.update_reports()
+
+    def poll_orders(self):
+        self.refresh_orders()
+        self.root.after(1000, self.poll_orders)
+
+    def load_analytics(self):
+        try:
+            analytics = SalesAnalytics(self.order_store).load()
+        except (OSError, ValueError):
             return
+        self.call_in_ui(self.analytics_loaded, analytics)
+
+    def analytics_loaded(self, analytics):
+        analytics.catch_up()
+        self.analytics = analytics
 
-        if not self.phone_entry.get():
-            messagebox.showerror("Error", "Please enter your phone number")
+    def load_customers(self):
+        try:
+            customers = CustomerIndex(self.order_store).load()
+        except (OSError, ValueError):
             return
-        if any(char.isdigit() for char in self.name_entry.get()):
-            messagebox.showerror("Error", "Name should not contain numbers.")
+        self.call_in_ui(self.customers_loaded, customers)
+
+    def customers_loaded(self, customers):
+        customers.catch_up()
+        self.customers = customers
+
+    def suggest_customers(self, event, entry, field):
+        if event.keysym == "Down" and self.suggestions:
+            self.suggestion_box.focus_set()
+            self.suggestion_box.selection_clear(0, tk.END)
+            self.suggestion_box.selection_set(0)
+            self.suggestion_box.activate(0)
             return
+        if event.keysym in ("Escape", "Return", "Tab"):
+            self.hide_suggestions()
+            return
+        text = entry.get().strip()
+        if self.customers is None or not text:
+            self.hide_suggestions()
+            return
+        if field == "phone":
+            self.suggestions = self.customers.search_phone(text)
+        else:
+            self.suggestions = self.customers.search_name(text)
+        if not self.suggestions:
+            self.hide_suggestions()
+            return
+        self.suggestion_box.delete(0, tk.END)
+        for customer in self.suggestions:
+            self.suggestion_box.insert(tk.END, f"{customer['name']} ({customer['phone']})")
+        self.suggestion_box.config(height=len(self.suggestions))
+        self.suggestion_box.place(x=entry.winfo_rootx() - self.root.winfo_rootx(),
+                                  y=entry.winfo_rooty() - self.root.winfo_rooty() + entry.winfo_height(),
+                                  width=max(entry.winfo_width(), 220))
+        self.suggestion_box.lift()
+
+    def hide_suggestions(self, force=False):
+        # Leave the list up while the user is moving through it
+        if not force and self.root.focus_get() is self.suggestion_box:
+            return
+        self.suggestions = []
+        self.suggestion_box.place_forget()
 
-        if any(char.isalpha() for char in self.phone_entry.get()):
-            messagebox.showerror("Error", "Phone number should not contain letters.")
+    def pick_suggestion(self, event=None):
+        selection = self.suggestion_box.curselection()
+        if not selection:
             return
+        customer = self.suggestions[selection[0]]
+        self.name_entry.delete(0, tk.END)
+        self.name_entry.insert(0, customer["name"])
+        self.phone_entry.delete(0, tk.END)
+        self.phone_entry.insert(0, customer["phone"])
+        if customer["address"]:
+            self.address_text.delete(1.0, tk.END)
+            self.address_text.insert(tk.END, customer["address"])
+        if customer["favorite_flavor"] in self.menu_items:
+            self.flavor_var.set(customer["favorite_flavor"])
+        self.hide_suggestions(force=True)
+        self.name_entry.focus_set()
+        self.update_summary()
 
-        # Card number validation
-        if self.payment_var.get() == "Card":
-            card_number = self.card_entry.get()
-            if not card_number or card_number.strip() == "":
-                messagebox.showerror("Error", "Please enter your card number")
-                return
+    def save_order_to_file(self, order):
+        """Append the new order to the order log."""
+        try:
+            self.order_writer.append(order)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save order to file: {e}")
 
-        if self.delivery_var.get() == "Delivery" and not self.address_text.get(1.0, tk.END).strip():
-            messagebox.showerror("Error", "Please enter delivery address")
+    def place_order(self):
+        if self.receipt_pool.full():
+            messagebox.showerror("Error", "Receipts are still printing, please wait a moment.")
             return
 
-        flavor = self.flavor_var.get()
-        scoops = self.scoops_var.get()
-        container = self.container_var.get()
-        total = self.calculate_icecream_price(
-            flavor, scoops, self.menu_items, container, self.container_prices
-        )
-
-        name = self.name_entry.get()
-        phone = self.phone_entry.get()
-        payment = self.payment_var.get()
-        delivery = self.delivery_var.get()
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # ASCII-safe summary for PDF
-        summary = f"Order Summary for {name}:\n\n"
-        summary += f"- {scoops} scoop(s) of {flavor} in a {container}\n"
-        summary += f"- Payment: {payment}\n"
-        if payment == "Card":
-            card_number = self.card_entry.get()
-            if card_number:
-                summary += f"- Card Number: ****{card_number[-4:]}\n"
-            else:
-                summary += f"- Card Number: [Please enter card number]\n"
-        summary += f"- Delivery: {delivery}\n"
-        summary += f"- Total: Rs.{total:.2f}\n"
-
-        if delivery == "Delivery":
-            address = self.address_text.get(1.0, tk.END).strip()
-            if address:
-                summary += f"- Delivery address: {address}\n"
-            else:
-                summary += "- Delivery address: [Please enter address]\n"
-
-        order = {
-            "order_id": random.randint(1000, 9999),
-            "customer_name": name,
-            "phone": phone,
-            "flavor": flavor,
-            "scoops": scoops,
-            "container": container,
-            "payment": payment,
-            "delivery": delivery,
-            "total": total,
-            "timestamp": timestamp,
-            "summary": summary
+        request = {
+            "name": self.name_entry.get(),
+            "phone": self.phone_entry.get(),
+            "flavor": self.flavor_var.get(),
+            "scoops": self.scoops_var.get(),
+            "container": self.container_var.get(),
+            "payment": self.payment_var.get(),
+            "delivery": self.delivery_var.get(),
+            "address": self.address_text.get(1.0, tk.END).strip(),
+            "card_number": self.card_entry.get()
         }
+        if self.cart:
+            request["items"] = [{"flavor": flavor, "scoops": scoops, "container": container}
+                                for flavor, scoops, container in self.cart]
+        errors = self.order_service.validate(request)
+        if errors:
+            messagebox.showerror("Error", errors[0]["message"])
+            return
 
-        if order["delivery"] == "Delivery":
-            order["address"] = self.address_text.get(1.0, tk.END).strip()
-        if order["payment"] == "Card":
-            order["card_number"] = self.card_entry.get()
+        order = self.order_service.build_order(request)
 
-        self.order_history.append(order)
         self.save_order_to_file(order)
-        self.update_history()
-
-        # Generate PDF receipt
-        pdf_filename = self.generate_pdf_receipt(order)
+        self.refresh_orders()
 
-        # Show confirmation with "Download Receipt" option
-        self.show_receipt_popup(order, pdf_filename)
+        # Show confirmation right away; the PDF receipt is rendered in the background
+        receipt_ready = self.show_receipt_popup(order)
+        self.receipt_pool.submit(order, lambda order_id, error: self.receipt_done(receipt_ready, order_id, error))
+        if self.receipt_pool.full():
+            self.order_btn.config(state=tk.DISABLED)
 
         self.name_entry.delete(0, tk.END)
         self.phone_entry.delete(0, tk.END)
@@ -567,21 +769,46 @@ class IceCreamShopApp:
         self.delivery_var.set("Takeaway")
         self.address_text.delete(1.0, tk.END)
         self.card_entry.delete(0, tk.END)
+        self.cart.clear()
+        self.cart_list.delete(0, tk.END)
+        self.hide_suggestions()
         self.toggle_address()
         self.toggle_card_entry()
         self.update_summary()
 
-    def show_receipt_popup(self, order, pdf_filename):
+    def receipt_done(self, receipt_ready, order_id, error):
+        if not self.receipt_pool.full():
+            self.order_btn.config(state=tk.NORMAL)
+        receipt_ready(order_id, error)
+
+    def show_receipt_popup(self, order):
         def download_receipt():
+            from tkinter import filedialog
+
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".pdf",
-                initialfile=pdf_filename,
+                initialfile=receipt_filename(order),
                 filetypes=[("PDF files", "*.pdf")]
             )
             if file_path:
-                shutil.copy(pdf_filename, file_path)
+                try:
+                    # Re-rendered from the order if it is missing from the archive
+                    pdf = self.receipt_archive.get(order)
+                    with open(file_path, "wb") as f:
+                        f.write(pdf)
+                except (OSError, ValueError) as e:
+                    messagebox.showerror("Error", f"Failed to save receipt: {e}")
+                    return
                 messagebox.showinfo("Receipt Saved", f"Receipt saved to: {file_path}")
 
+        def receipt_ready(order_id, error=None):
+            if not popup.winfo_exists():
+                return
+            if error is not None:
+                download_btn.config(text="Receipt Failed")
+                return
+            download_btn.config(text="Download Receipt", state=tk.NORMAL)
+
         popup = tk.Toplevel(self.root)
         popup.title("Order Placed")
         popup.geometry("350x180")
@@ -601,11 +828,100 @@ class IceCreamShopApp:
                  font=("Arial", 12, "bold")).pack(pady=10)
         tk.Label(popup, text=f"Thank you, {order['customer_name']}!", font=("Arial", 11)).pack()
         tk.Label(popup, text=f"Total: Rs.{order['total']:.2f}", font=("Arial", 11)).pack(pady=5)
-        download_btn = tk.Button(popup, text="Download Receipt", command=download_receipt,
-                                 bg="#3F72AF", fg="white", font=("Arial", 11, "bold"))
+        download_btn = tk.Button(popup, text="Preparing Receipt...", command=download_receipt,
+                                 bg="#3F72AF", fg="white", font=("Arial", 11, "bold"), state=tk.DISABLED)
         download_btn.pack(pady=10)
         tk.Button(popup, text="Close", command=popup.destroy, font=("Arial", 10)).pack()
+        return receipt_ready
         
+    def show_reports(self):
+        if self.analytics is None:
+            messagebox.showinfo("Reports", "Still loading orders, please try again in a moment.")
+            return
+        if self.reports_window is not None and self.reports_window.winfo_exists():
+            self.reports_window.lift()
+            return
+        popup = tk.Toplevel(self.root)
+        popup.title("Sales Reports")
+        popup.geometry("420x500")
+        self.reports_window = popup
+
+        top = tk.Frame(popup)
+        top.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(top, text="Period:", font=("Arial", 10)).pack(side=tk.LEFT)
+        self.report_period_var = tk.StringVar(value="Today")
+        period_menu = ttk.Combobox(top, textvariable=self.report_period_var, state="readonly",
+                                   values=["Today", "Last 7 days", "Last 30 days", "This year", "All time"])
+        period_menu.pack(side=tk.LEFT, padx=5)
+        period_menu.bind("<<ComboboxSelected>>", lambda event: self.update_reports())
+
+        self.reports_text = scrolledtext.ScrolledText(popup, bg="white", fg="#4B4453", font=("Courier", 10))
+        self.reports_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.update_reports()
+
+    def update_reports(self):
+        today = datetime.date.today()
+        start = {"Today": today,
+                 "Last 7 days": today - datetime.timedelta(days=6),
+                 "Last 30 days": today - datetime.timedelta(days=29),
+                 "This year": today.replace(month=1, day=1)}.get(self.report_period_var.get())
+        report = self.analytics.report(start.isoformat() if start else None)
+
+        lines = [f"Orders: {report['orders']}", f"Revenue: Rs.{report['revenue']:.2f}", ""]
+        lines.append("Revenue by day:")
+        # Only the most recent days fit on screen
+        for day, revenue in list(report["revenue_by_day"].items())[-31:]:
+            lines.append(f"  {day}  Rs.{revenue:>10.2f}")
+        lines += ["", "Revenue by hour:"]
+        for hour, revenue in enumerate(report["hours"]):
+            if revenue:
+                lines.append(f"  {hour:02d}:00  Rs.{revenue:>10.2f}")
+        lines += ["", "Scoops by flavor:"]
+        for flavor, scoops in report["scoops"].items():
+            lines.append(f"  {flavor:<24} {scoops:>6}")
+        for field in MIX_FIELDS:
+            lines += ["", f"{field.capitalize()} mix:"]
+            for value, count in sorted(report[field].items(), key=lambda item: -item[1]):
+                lines.append(f"  {value:<12} {count:>6}  ({count * 100 / report['orders']:.0f}%)")
+
+        self.reports_text.config(state=tk.NORMAL)
+        self.reports_text.delete(1.0, tk.END)
+        self.reports_text.insert(tk.END, "\n".join(lines))
+        self.reports_text.config(state=tk.DISABLED)
+
+    def show_diagnostics(self, event=None):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        popup = tk.Toplevel(self.root)
+        popup.title("Diagnostics")
+        popup.geometry("620x320")
+        self.diagnostics_window = popup
+        self.diagnostics_text = scrolledtext.ScrolledText(popup, bg="white", fg="#4B4453", font=("Courier", 10))
+        self.diagnostics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.update_diagnostics()
+
+    def update_diagnostics(self):
+        if not self.diagnostics_window.winfo_exists():
+            return
+        if self.metrics is None:
+            lines = ["Timings are off. Start the till with --metrics to record them."]
+        else:
+            snapshot = self.metrics.snapshot()
+            lines = [f"Orders in the last minute: {snapshot['orders_per_minute']}", "",
+                     f"{'operation':<22} {'count':>7} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}"]
+            for name, timer in snapshot["timers"].items():
+                times = " ".join(f"{timer[key] * 1e3:>8.2f}ms" for key in ("p50", "p95", "p99", "max"))
+                lines.append(f"{name:<22} {timer['count']:>7} {times}")
+        lines += ["", f"Receipts waiting: {self.receipt_pool.jobs.qsize()}",
+                  "Summary: " + ", ".join(f"{count} {what}" for what, count in self.summary_stats.items())]
+
+        self.diagnostics_text.config(state=tk.NORMAL)
+        self.diagnostics_text.delete(1.0, tk.END)
+        self.diagnostics_text.insert(tk.END, "\n".join(lines))
+        self.diagnostics_text.config(state=tk.DISABLED)
+        self.root.after(1000, self.update_diagnostics)
+
     def update_history(self):
         self.history_text.config(state=tk.NORMAL)
         self.history_text.delete(1.0, tk.END)
@@ -616,16 +932,32 @@ class IceCreamShopApp:
             return
 
         for order in self.order_history[-5:]:
+            # Cart orders list their first item, like a single order, plus a count
+            more = len(order.get("items", ())) - 1
+            extra = f" + {more} more" if more > 0 else ""
             self.history_text.insert(tk.END,
                                     f"Order #{order['order_id']} - {order['timestamp']}\n"
-                                    f"{order['customer_name']} ({order['phone']}): {order['scoops']}x {order['flavor']}\n"
+                                    f"{order['customer_name']} ({order['phone']}): {order['scoops']}x {order['flavor']}{extra}\n"
                                     f"({order['container']}, {order['payment']}, {order['delivery']}, Total: Rs.{order['total']:.2f})\n\n")
 
         self.history_text.config(state=tk.DISABLED)
 
 def main():
+    parser = argparse.ArgumentParser(description="Velvet Cone ordering system")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup phase takes, then exit")
+    parser.add_argument("--metrics", nargs="?", const="velvet_cone_metrics.json", metavar="FILE",
+                        help="time the hot paths and write them to FILE (.prom for Prometheus text) "
+                             "every --metrics-interval seconds; Ctrl+Shift+D shows them live")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, metavar="SECONDS")
+    args = parser.parse_args()
+    profile = StartupProfile() if args.profile_startup else None
+    if profile is not None:
+        profile.mark("imports")
     root = tk.Tk()
-    app = IceCreamShopApp(root)
+    if profile is not None:
+        profile.mark("tk root")
+    app = IceCreamShopApp(root, profile, args.metrics, args.metrics_interval)
     root.mainloop()
 
 if __name__ == "__main__":